@@ -1,5 +1,8 @@
 """Main CLI interface for Zappy the VPS Toolbox."""
 
+import importlib
+from typing import Callable, Tuple
+
 from .utils.ui import (
     console,
     clear_screen,
@@ -8,14 +11,133 @@ from .utils.ui import (
     select_from_list,
     pause,
 )
-from .utils.command import verify_sudo
+from .utils.command import verify_sudo, keep_sudo_alive
+
+# Managers by attribute name, imported on first use so startup only
+# loads the modules of the menus actually opened
+_MANAGERS = {
+    "nginx": (".modules.nginx", "NginxManager"),
+    "certbot": (".modules.nginx", "CertbotManager"),
+    "firewall": (".modules.firewall", "FirewallManager"),
+    "ssh": (".modules.security", "SSHManager"),
+    "fail2ban": (".modules.security", "Fail2banManager"),
+    "updates": (".modules.security", "AutoUpdatesManager"),
+    "docker": (".modules.docker", "DockerInstaller"),
+    "dockge": (".modules.docker", "DockgeManager"),
+    "packages": (".modules.system", "PackagesManager"),
+    "shell": (".modules.system", "ShellSetup"),
+    "aitermy": (".modules.system", "AiTermyInstaller"),
+    "monitor": (".modules.system", "SystemMonitor"),
+}
+
+# Constructor arguments filled with other managers, so managers that
+# touch the same state share one instance
+_MANAGER_DEPS = {
+    "certbot": {"nginx_manager": "nginx"},
+}
+
+
+# (labels, action paths) for select_from_list
+Menu = Tuple[Tuple[str, ...], Tuple[str, ...]]
+
+
+def _menu(*entries: Tuple[str, str]) -> Menu:
+    """Split (label, action path) pairs into parallel tuples, built once."""
+    labels, actions = zip(*entries)
+    return labels, actions
+
+
+MAIN_MENU = _menu(
+    ("Nginx Management", "nginx_menu"),
+    ("Firewall Management", "firewall_menu"),
+    ("Security Hardening", "security_menu"),
+    ("Docker Setup", "docker_menu"),
+    ("System Utilities", "system_menu"),
+)
+
+NGINX_MENU = _menu(
+    ("List domains", "nginx.list_domains"),
+    ("Add domain", "nginx.add_domain"),
+    ("Enable domain", "nginx.enable_domain"),
+    ("Disable domain", "nginx.disable_domain"),
+    ("Delete domain", "nginx.delete_domain"),
+    ("View/Edit config", "nginx_config_menu"),
+    ("SSL Certificates", "ssl_menu"),
+    ("Reload nginx", "nginx.reload"),
+    ("Nginx status", "nginx.status"),
+)
+
+NGINX_CONFIG_MENU = _menu(
+    ("View configuration", "nginx.view_config"),
+    ("Edit configuration", "nginx.edit_config"),
+)
+
+SSL_MENU = _menu(
+    ("Add HTTPS to domain", "certbot.add_https"),
+    ("List certificates", "certbot.list_certificates"),
+    ("Renew certificates", "certbot.renew_certificate"),
+    ("Delete certificate", "certbot.delete_certificate"),
+    ("Check renewal timer", "certbot.check_renewal_timer"),
+)
+
+FIREWALL_MENU = _menu(
+    ("Show status", "firewall.show_status"),
+    ("Open port", "firewall.open_port"),
+    ("Close port", "firewall.close_port"),
+    ("Allow service", "firewall.allow_service"),
+    ("List rules", "firewall.list_rules"),
+    ("Enable firewall", "_firewall_enable"),
+    ("Disable firewall", "_firewall_disable"),
+)
+
+SECURITY_MENU = _menu(
+    ("SSH Configuration", "ssh_menu"),
+    ("Fail2ban Setup", "fail2ban_menu"),
+    ("Automatic Updates", "updates_menu"),
+)
+
+SSH_MENU = _menu(
+    ("Show current status", "ssh.show_status"),
+    ("Change SSH port", "ssh.change_port"),
+    ("Configure root login", "ssh.disable_root_login"),
+    ("Configure password authentication", "ssh.disable_password_auth"),
+    ("Apply recommended hardening", "ssh.harden_all"),
+)
+
+FAIL2BAN_MENU = _menu(
+    ("Show status", "fail2ban.show_status"),
+    ("Install/Configure", "fail2ban.install"),
+    ("Show banned IPs", "fail2ban.show_banned"),
+    ("Unban IP", "fail2ban.unban_ip"),
+)
 
-# Import managers
-from .modules.nginx import NginxManager, CertbotManager
-from .modules.firewall import FirewallManager
-from .modules.security import SSHManager, Fail2banManager, AutoUpdatesManager
-from .modules.docker import DockerInstaller, DockgeManager
-from .modules.system import PackagesManager, ShellSetup, AiTermyInstaller, SystemMonitor
+UPDATES_MENU = _menu(
+    ("Show status", "updates.show_status"),
+    ("Setup auto-updates", "updates.setup"),
+    ("Check for updates", "updates.check_updates"),
+)
+
+DOCKER_MENU = _menu(
+    ("Docker status", "docker.show_status"),
+    ("Install Docker", "docker.install"),
+    ("Docker info", "docker.show_info"),
+    ("Dockge status", "dockge.show_status"),
+    ("Install Dockge", "dockge.install"),
+    ("Update Dockge", "dockge.update"),
+    ("Uninstall Dockge", "dockge.uninstall"),
+)
+
+SYSTEM_MENU = _menu(
+    ("Install common tools", "packages.install_menu"),
+    ("Show installed tools", "packages.show_installed"),
+    ("Setup zsh + oh-my-zsh", "shell.setup"),
+    ("Shell status", "shell.show_status"),
+    ("Install AiTermy", "aitermy.install"),
+    ("Update AiTermy", "aitermy.update"),
+    ("Uninstall AiTermy", "aitermy.uninstall"),
+    ("AiTermy status", "aitermy.show_status"),
+    ("System monitoring", "monitor.show_menu"),
+)
 
 
 class VPSToolbox:
@@ -23,19 +145,18 @@ class VPSToolbox:
 
     VERSION = "1.0.0"
 
-    def __init__(self):
-        self.nginx = NginxManager()
-        self.certbot = CertbotManager()
-        self.firewall = FirewallManager()
-        self.ssh = SSHManager()
-        self.fail2ban = Fail2banManager()
-        self.updates = AutoUpdatesManager()
-        self.docker = DockerInstaller()
-        self.dockge = DockgeManager()
-        self.packages = PackagesManager()
-        self.shell = ShellSetup()
-        self.aitermy = AiTermyInstaller()
-        self.monitor = SystemMonitor()
+    def __getattr__(self, name: str):
+        """Create a manager on first access and keep it on the instance."""
+        try:
+            module_name, class_name = _MANAGERS[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+        module = importlib.import_module(module_name, __package__)
+        kwargs = {arg: getattr(self, dep) for arg, dep in _MANAGER_DEPS.get(name, {}).items()}
+        manager = getattr(module, class_name)(**kwargs)
+        setattr(self, name, manager)
+        return manager
 
     def run(self):
         """Run the main application loop."""
@@ -44,10 +165,39 @@ class VPSToolbox:
             print_error("Please run with sudo or configure sudo permissions.")
             return
 
+        keep_sudo_alive()
+
         while True:
             if not self.main_menu():
                 break
 
+    def _action(self, path: str) -> Callable[[], object]:
+        """Resolve a dotted menu action such as "nginx.list_domains"."""
+        target = self
+        for attr in path.split("."):
+            target = getattr(target, attr)
+        return target
+
+    def _run_menu(self, title: str, menu: Menu, prompt_text: str = "Select action:"):
+        """Show a menu until the user goes back, running the chosen actions.
+
+        Args:
+            title: Menu header
+            menu: Labels and action paths built by _menu()
+            prompt_text: Prompt shown above the options
+        """
+        labels, actions = menu
+        while True:
+            clear_screen()
+            print_header(title)
+
+            choice = select_from_list(labels, prompt_text)
+
+            if choice is None:
+                return
+
+            self._action(actions[choice])()
+
     def main_menu(self) -> bool:
         """Display the main menu.
 
@@ -57,341 +207,71 @@ class VPSToolbox:
         clear_screen()
         print_header(f"Zappy the VPS Toolbox v{self.VERSION}", "Comprehensive VPS Management")
 
-        options = [
-            "Nginx Management",
-            "Firewall Management",
-            "Security Hardening",
-            "Docker Setup",
-            "System Utilities",
-        ]
-
-        choice = select_from_list(options, "Choose a category:")
+        labels, actions = MAIN_MENU
+        choice = select_from_list(labels, "Choose a category:")
 
         if choice is None:
             return False
 
-        if choice == 0:
-            self.nginx_menu()
-        elif choice == 1:
-            self.firewall_menu()
-        elif choice == 2:
-            self.security_menu()
-        elif choice == 3:
-            self.docker_menu()
-        elif choice == 4:
-            self.system_menu()
-
+        self._action(actions[choice])()
         return True
 
     def nginx_menu(self):
         """Display Nginx management menu."""
-        while True:
-            clear_screen()
-            print_header("Nginx Management")
-
-            options = [
-                "List domains",
-                "Add domain",
-                "Enable domain",
-                "Disable domain",
-                "Delete domain",
-                "View/Edit config",
-                "SSL Certificates",
-                "Reload nginx",
-                "Nginx status",
-            ]
-
-            choice = select_from_list(options, "Select action:")
-
-            if choice is None:
-                return
-
-            if choice == 0:
-                self.nginx.list_domains()
-            elif choice == 1:
-                self.nginx.add_domain()
-            elif choice == 2:
-                self.nginx.enable_domain()
-            elif choice == 3:
-                self.nginx.disable_domain()
-            elif choice == 4:
-                self.nginx.delete_domain()
-            elif choice == 5:
-                self.nginx_config_menu()
-            elif choice == 6:
-                self.ssl_menu()
-            elif choice == 7:
-                self.nginx.reload()
-            elif choice == 8:
-                self.nginx.status()
+        self._run_menu("Nginx Management", NGINX_MENU)
 
     def nginx_config_menu(self):
         """Display Nginx config submenu."""
         clear_screen()
         print_header("View/Edit Configuration")
 
-        options = [
-            "View configuration",
-            "Edit configuration",
-        ]
-
-        choice = select_from_list(options, "Select action:")
+        labels, actions = NGINX_CONFIG_MENU
+        choice = select_from_list(labels, "Select action:")
 
-        if choice == 0:
-            self.nginx.view_config()
-        elif choice == 1:
-            self.nginx.edit_config()
+        if choice is not None:
+            self._action(actions[choice])()
 
     def ssl_menu(self):
         """Display SSL certificates menu."""
-        while True:
-            clear_screen()
-            print_header("SSL Certificates")
-
-            options = [
-                "Add HTTPS to domain",
-                "List certificates",
-                "Renew certificates",
-                "Delete certificate",
-                "Check renewal timer",
-            ]
-
-            choice = select_from_list(options, "Select action:")
-
-            if choice is None:
-                return
-
-            if choice == 0:
-                self.certbot.add_https()
-            elif choice == 1:
-                self.certbot.list_certificates()
-            elif choice == 2:
-                self.certbot.renew_certificate()
-            elif choice == 3:
-                self.certbot.delete_certificate()
-            elif choice == 4:
-                self.certbot.check_renewal_timer()
+        self._run_menu("SSL Certificates", SSL_MENU)
 
     def firewall_menu(self):
         """Display firewall management menu."""
-        while True:
-            clear_screen()
-            print_header("Firewall Management")
-
-            options = [
-                "Show status",
-                "Open port",
-                "Close port",
-                "Allow service",
-                "List rules",
-                "Enable firewall",
-                "Disable firewall",
-            ]
+        self._run_menu("Firewall Management", FIREWALL_MENU)
 
-            choice = select_from_list(options, "Select action:")
+    def _firewall_enable(self):
+        """Enable the firewall and wait for the user."""
+        self.firewall.enable()
+        pause()
 
-            if choice is None:
-                return
-
-            if choice == 0:
-                self.firewall.show_status()
-            elif choice == 1:
-                self.firewall.open_port()
-            elif choice == 2:
-                self.firewall.close_port()
-            elif choice == 3:
-                self.firewall.allow_service()
-            elif choice == 4:
-                self.firewall.list_rules()
-            elif choice == 5:
-                self.firewall.enable()
-                pause()
-            elif choice == 6:
-                self.firewall.disable()
-                pause()
+    def _firewall_disable(self):
+        """Disable the firewall and wait for the user."""
+        self.firewall.disable()
+        pause()
 
     def security_menu(self):
         """Display security hardening menu."""
-        while True:
-            clear_screen()
-            print_header("Security Hardening")
-
-            options = [
-                "SSH Configuration",
-                "Fail2ban Setup",
-                "Automatic Updates",
-            ]
-
-            choice = select_from_list(options, "Select category:")
-
-            if choice is None:
-                return
-
-            if choice == 0:
-                self.ssh_menu()
-            elif choice == 1:
-                self.fail2ban_menu()
-            elif choice == 2:
-                self.updates_menu()
+        self._run_menu("Security Hardening", SECURITY_MENU, "Select category:")
 
     def ssh_menu(self):
         """Display SSH configuration menu."""
-        while True:
-            clear_screen()
-            print_header("SSH Configuration")
-
-            options = [
-                "Show current status",
-                "Change SSH port",
-                "Configure root login",
-                "Configure password authentication",
-                "Apply recommended hardening",
-            ]
-
-            choice = select_from_list(options, "Select action:")
-
-            if choice is None:
-                return
-
-            if choice == 0:
-                self.ssh.show_status()
-            elif choice == 1:
-                self.ssh.change_port()
-            elif choice == 2:
-                self.ssh.disable_root_login()
-            elif choice == 3:
-                self.ssh.disable_password_auth()
-            elif choice == 4:
-                self.ssh.harden_all()
+        self._run_menu("SSH Configuration", SSH_MENU)
 
     def fail2ban_menu(self):
         """Display Fail2ban menu."""
-        while True:
-            clear_screen()
-            print_header("Fail2ban")
-
-            options = [
-                "Show status",
-                "Install/Configure",
-                "Show banned IPs",
-                "Unban IP",
-            ]
-
-            choice = select_from_list(options, "Select action:")
-
-            if choice is None:
-                return
-
-            if choice == 0:
-                self.fail2ban.show_status()
-            elif choice == 1:
-                self.fail2ban.install()
-            elif choice == 2:
-                self.fail2ban.show_banned()
-            elif choice == 3:
-                self.fail2ban.unban_ip()
+        self._run_menu("Fail2ban", FAIL2BAN_MENU)
 
     def updates_menu(self):
         """Display auto-updates menu."""
-        while True:
-            clear_screen()
-            print_header("Automatic Security Updates")
-
-            options = [
-                "Show status",
-                "Setup auto-updates",
-                "Check for updates",
-            ]
-
-            choice = select_from_list(options, "Select action:")
-
-            if choice is None:
-                return
-
-            if choice == 0:
-                self.updates.show_status()
-            elif choice == 1:
-                self.updates.setup()
-            elif choice == 2:
-                self.updates.check_updates()
+        self._run_menu("Automatic Security Updates", UPDATES_MENU)
 
     def docker_menu(self):
         """Display Docker setup menu."""
-        while True:
-            clear_screen()
-            print_header("Docker Setup")
-
-            options = [
-                "Docker status",
-                "Install Docker",
-                "Docker info",
-                "Dockge status",
-                "Install Dockge",
-                "Update Dockge",
-                "Uninstall Dockge",
-            ]
-
-            choice = select_from_list(options, "Select action:")
-
-            if choice is None:
-                return
-
-            if choice == 0:
-                self.docker.show_status()
-            elif choice == 1:
-                self.docker.install()
-            elif choice == 2:
-                self.docker.show_info()
-            elif choice == 3:
-                self.dockge.show_status()
-            elif choice == 4:
-                self.dockge.install()
-            elif choice == 5:
-                self.dockge.update()
-            elif choice == 6:
-                self.dockge.uninstall()
+        self._run_menu("Docker Setup", DOCKER_MENU)
 
     def system_menu(self):
         """Display system utilities menu."""
-        while True:
-            clear_screen()
-            print_header("System Utilities")
-
-            options = [
-                "Install common tools",
-                "Show installed tools",
-                "Setup zsh + oh-my-zsh",
-                "Shell status",
-                "Install AiTermy",
-                "Update AiTermy",
-                "Uninstall AiTermy",
-                "AiTermy status",
-                "System monitoring",
-            ]
-
-            choice = select_from_list(options, "Select action:")
-
-            if choice is None:
-                return
-
-            if choice == 0:
-                self.packages.install_menu()
-            elif choice == 1:
-                self.packages.show_installed()
-            elif choice == 2:
-                self.shell.setup()
-            elif choice == 3:
-                self.shell.show_status()
-            elif choice == 4:
-                self.aitermy.install()
-            elif choice == 5:
-                self.aitermy.update()
-            elif choice == 6:
-                self.aitermy.uninstall()
-            elif choice == 7:
-                self.aitermy.show_status()
-            elif choice == 8:
-                self.monitor.show_menu()
+        self._run_menu("System Utilities", SYSTEM_MENU)
 
 
 def main():
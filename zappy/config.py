@@ -2,13 +2,15 @@
 
 import os
 import subprocess
+import time
 from pathlib import Path
-from datetime import datetime
+from typing import Set
 
 # Nginx paths
 NGINX_SITES_AVAILABLE = "/etc/nginx/sites-available"
 NGINX_SITES_ENABLED = "/etc/nginx/sites-enabled"
 NGINX_LOG_DIR = "/var/log/nginx"
+NGINX_CONF = "/etc/nginx/nginx.conf"
 
 # Backup directory
 BACKUP_DIR = Path("/var/backups/zappy")
@@ -16,6 +18,7 @@ BACKUP_DIR = Path("/var/backups/zappy")
 # Docker paths
 DOCKGE_DIR = Path("/opt/dockge")
 DOCKER_STACKS_DIR = Path("/opt/stacks")
+DOCKER_SOCKET = "/var/run/docker.sock"
 
 # AiTermy path
 AITERMY_DIR = Path("/opt/aitermy")
@@ -25,6 +28,17 @@ SSH_CONFIG_PATH = Path("/etc/ssh/sshd_config")
 
 # Certbot
 CERTBOT_EMAIL_FILE = Path.home() / ".zappy" / "certbot-email"
+LETSENCRYPT_RENEWAL_DIR = "/etc/letsencrypt/renewal"
+
+# Per-user cache for detection results reused across runs
+CACHE_DIR = Path.home() / ".cache" / "zappy"
+FIREWALL_CACHE_FILE = CACHE_DIR / "firewall.json"
+FIREWALL_CACHE_TTL = 3600  # seconds
+DOCKGE_PORT_CACHE_FILE = CACHE_DIR / "dockge_port"
+NGINX_GOOD_CONFIGS_FILE = CACHE_DIR / "nginx_good.json"
+
+# Backup subdirectories already ensured this session
+_ensured_backup_dirs: Set[str] = set()
 
 
 def get_backup_path(config_type: str, name: str = "") -> Path:
@@ -37,7 +51,7 @@ def get_backup_path(config_type: str, name: str = "") -> Path:
     Returns:
         Path to backup file
     """
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
     filename = f"{config_type}_{name}_{timestamp}.bak" if name else f"{config_type}_{timestamp}.bak"
     return BACKUP_DIR / config_type / filename
 
@@ -51,14 +65,21 @@ def ensure_backup_dir(config_type: str) -> Path:
     Returns:
         Path to backup directory
     """
+    from .utils.command import as_root
+
     backup_path = BACKUP_DIR / config_type
+    if config_type in _ensured_backup_dirs:
+        return backup_path
 
     # Use sudo to create directory since /var/backups requires root
     if not backup_path.exists():
-        subprocess.run(
-            ["sudo", "mkdir", "-p", str(backup_path)],
+        result = subprocess.run(
+            as_root(["mkdir", "-p", str(backup_path)]),
             capture_output=True,
             check=False
         )
+        if result.returncode != 0:
+            return backup_path
 
+    _ensured_backup_dirs.add(config_type)
     return backup_path
@@ -1,9 +1,22 @@
 """Dockge container manager installation."""
 
+import os
+import re
+import socket
+import tempfile
 from pathlib import Path
-
-from ...config import DOCKGE_DIR, DOCKER_STACKS_DIR
-from ...utils.command import run_sudo, run_command, check_command_exists, write_file_sudo
+from typing import Optional
+from urllib.parse import urlencode
+
+from ...config import DOCKGE_DIR, DOCKER_STACKS_DIR, DOCKER_SOCKET, DOCKGE_PORT_CACHE_FILE
+from ...utils.command import (
+    run_sudo,
+    run_sudo_batch,
+    run_command,
+    check_command_exists,
+    write_file_sudo,
+    write_stream_sudo,
+)
 from ...utils.ui import (
     console,
     print_success,
@@ -16,16 +29,49 @@ from ...utils.ui import (
     clear_screen,
     print_header,
 )
+from ...utils.http import download, prewarm, unix_fetch, unix_request
 from ...utils.validators import validate_port
 
+COMPOSE_URL = "https://dockge.kuma.pet/compose.yaml"
+DOCKGE_IMAGE = "louislam/dockge:1"
+DOCKGE_CONTAINER = "dockge"
+
+# Host port mapped to Dockge's internal 5001; ports sit near the top of the file
+_PORT_RE = re.compile(rb'"(\d+):5001"')
+_PORT_SCAN_BYTES = 2048
+_PROBE_TIMEOUT = 0.2  # seconds
+# Image pulls stream progress, but layer extraction can go quiet for a while
+_PULL_TIMEOUT = 300  # seconds
+
 
 class DockgeManager:
     """Manages Dockge installation."""
 
+    # Fallback compose file used when the online generator is unreachable
+    _COMPOSE_TEMPLATE = """version: "3.8"
+services:
+  dockge:
+    image: {image}
+    container_name: dockge
+    restart: unless-stopped
+    ports:
+      - "{port}:5001"
+    volumes:
+      - /var/run/docker.sock:/var/run/docker.sock
+      - ./data:/app/data
+      - {stacks_path}:{stacks_path}
+    environment:
+      - DOCKGE_STACKS_DIR={stacks_path}
+"""
+
     def __init__(self):
         self.dockge_dir = DOCKGE_DIR
         self.stacks_dir = DOCKER_STACKS_DIR
         self.default_port = "5001"
+        self._compose_file = self.dockge_dir / "compose.yaml"
+        self._compose_path = str(self._compose_file)
+        # Cached is_installed() result; reset by install()/uninstall()
+        self._installed: Optional[bool] = None
 
     def is_installed(self) -> bool:
         """Check if Dockge is installed.
@@ -33,8 +79,9 @@ class DockgeManager:
         Returns:
             True if installed, False otherwise
         """
-        compose_file = self.dockge_dir / "compose.yaml"
-        return compose_file.exists()
+        if self._installed is None:
+            self._installed = self._compose_file.is_file()
+        return self._installed
 
     def is_running(self) -> bool:
         """Check if Dockge is running.
@@ -42,17 +89,23 @@ class DockgeManager:
         Returns:
             True if running, False otherwise
         """
-        if not check_command_exists("docker"):
-            return False
+        # Fast path: Dockge answers on its published port
+        if self._port_open():
+            return True
 
+        # Not listening (yet); ask Docker in case it's still starting.
         # Try without sudo first
-        success, stdout, _ = run_command([
+        returncode, stdout, stderr = run_command([
             "docker", "ps", "--filter", "name=dockge", "--format", "{{.Names}}"
         ])
 
-        if success and "dockge" in stdout:
+        if returncode == 0 and "dockge" in stdout:
             return True
 
+        # run_command reports a missing binary instead of raising
+        if stderr.startswith("Command not found"):
+            return False
+
         # Try with sudo (needed before user logs out/in after Docker install)
         success, stdout, _ = run_sudo([
             "docker", "ps", "--filter", "name=dockge", "--format", "{{.Names}}"
@@ -60,6 +113,82 @@ class DockgeManager:
 
         return success and "dockge" in stdout
 
+    def _port_open(self) -> bool:
+        """Check whether something is listening on Dockge's port locally.
+
+        Returns:
+            True if a TCP connection succeeds, False otherwise
+        """
+        try:
+            port = int(self._get_port())
+        except ValueError:
+            return False
+
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=_PROBE_TIMEOUT):
+                return True
+        except OSError:
+            return False
+
+    def _get_port(self) -> str:
+        """Get the host port Dockge is published on.
+
+        The parsed port is cached on disk, keyed by compose.yaml's mtime,
+        so repeat lookups cost a stat instead of a read and regex scan.
+
+        Returns:
+            Port from compose.yaml, or the default port if it can't be read
+        """
+        try:
+            mtime = str(self._compose_file.stat().st_mtime_ns)
+        except OSError:
+            return self.default_port
+
+        try:
+            cached_port, cached_mtime = DOCKGE_PORT_CACHE_FILE.read_text().split(":")
+            if cached_mtime == mtime:
+                return cached_port
+        except (OSError, ValueError):
+            pass
+
+        try:
+            with self._compose_file.open("rb") as f:
+                head = f.read(_PORT_SCAN_BYTES)
+        except OSError:
+            return self.default_port
+
+        match = _PORT_RE.search(head)
+        port = match.group(1).decode() if match else self.default_port
+        self._save_port_cache(port, mtime)
+        return port
+
+    def _save_port_cache(self, port: str, mtime: str):
+        """Atomically write the port cache so concurrent runs never see a partial file.
+
+        Args:
+            port: Parsed port
+            mtime: compose.yaml mtime (ns) the port was read at
+        """
+        try:
+            DOCKGE_PORT_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=DOCKGE_PORT_CACHE_FILE.parent)
+            with os.fdopen(fd, "w") as f:
+                f.write(f"{port}:{mtime}")
+            os.replace(tmp_path, DOCKGE_PORT_CACHE_FILE)
+        except OSError:
+            pass
+
+    def _get_image_id(self) -> str:
+        """Get the local ID of the Dockge image.
+
+        Returns:
+            Image ID, or an empty string if the image isn't present
+        """
+        success, stdout, _ = run_sudo([
+            "docker", "image", "inspect", "--format", "{{.Id}}", DOCKGE_IMAGE
+        ], show_command=False)
+        return stdout.strip() if success else ""
+
     def install(self) -> bool:
         """Install Dockge.
 
@@ -86,6 +215,9 @@ class DockgeManager:
             pause()
             return True
 
+        # Connect to the compose generator while the user answers prompts
+        prewarm(COMPOSE_URL)
+
         # Get port
         port = prompt(f"Enter Dockge port", default=self.default_port).strip()
         is_valid, error = validate_port(port)
@@ -115,33 +247,30 @@ class DockgeManager:
 
         # Download compose.yaml
         console.print("[dim]Downloading Dockge compose.yaml...[/dim]")
-        compose_url = f"https://dockge.kuma.pet/compose.yaml?port={port}&stacksPath={stacks_path}"
-
-        # Download to temp location first, then move with sudo
-        import tempfile
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as tmp:
-            tmp_path = tmp.name
+        query = urlencode({"port": port, "stacksPath": stacks_path})
+        compose_url = f"{COMPOSE_URL}?{query}"
 
-        success, _, _ = run_command([
-            "curl", "-fsSL", compose_url, "-o", tmp_path
-        ])
+        # Stream straight from the socket into the root-owned file
+        downloaded = write_stream_sudo(
+            self._compose_path,
+            lambda f: download(compose_url, f),
+        )
 
-        if success:
-            # Move to final location with sudo
-            run_sudo(["mv", tmp_path, str(self.dockge_dir / "compose.yaml")], show_command=False)
-        else:
+        if not downloaded:
             # Fallback: create compose.yaml manually
             console.print("[dim]Using fallback compose.yaml...[/dim]")
             compose_content = self._get_compose_yaml(port, stacks_path)
-            if not write_file_sudo(str(self.dockge_dir / "compose.yaml"), compose_content):
+            if not write_file_sudo(self._compose_path, compose_content):
                 print_error("Failed to create compose.yaml")
                 pause()
                 return False
 
+        self._installed = True
+
         # Start Dockge (use sudo since user may not have docker group yet)
         console.print("[dim]Starting Dockge...[/dim]")
         success, stdout, stderr = run_sudo([
-            "docker", "compose", "-f", str(self.dockge_dir / "compose.yaml"),
+            "docker", "compose", "-f", self._compose_path,
             "up", "-d"
         ], show_command=False)
 
@@ -159,8 +288,8 @@ class DockgeManager:
         if confirm(f"\nOpen port {port} in firewall?"):
             from ..firewall import FirewallManager
             fw = FirewallManager()
-            if fw.firewall_type.value != "none":
-                run_sudo(["ufw", "allow", f"{port}/tcp"])
+            # Opens and reloads in one sudo call on either UFW or firewalld
+            if fw.open_port(port, "tcp", silent=True):
                 print_success(f"Port {port} opened.")
 
         pause()
@@ -176,21 +305,44 @@ class DockgeManager:
         Returns:
             Compose file content
         """
-        return f"""version: "3.8"
-services:
-  dockge:
-    image: louislam/dockge:1
-    container_name: dockge
-    restart: unless-stopped
-    ports:
-      - "{port}:5001"
-    volumes:
-      - /var/run/docker.sock:/var/run/docker.sock
-      - ./data:/app/data
-      - {stacks_path}:{stacks_path}
-    environment:
-      - DOCKGE_STACKS_DIR={stacks_path}
-"""
+        return self._COMPOSE_TEMPLATE.format(
+            image=DOCKGE_IMAGE,
+            port=port,
+            stacks_path=stacks_path,
+        )
+
+    def _container_action(self, action: str) -> bool:
+        """Start or stop the Dockge container through the Docker API socket.
+
+        Args:
+            action: Container action ("start" or "stop")
+
+        Returns:
+            True if the container is now in the requested state, False if
+            the caller should fall back to docker compose
+        """
+        status = unix_request(
+            DOCKER_SOCKET, "POST", f"/containers/{DOCKGE_CONTAINER}/{action}"
+        )
+        # 204: done, 304: already started/stopped
+        return status in (204, 304)
+
+    def _pull_image(self) -> Optional[bool]:
+        """Pull the Dockge image through the Docker API socket.
+
+        Returns:
+            True if the pull succeeded, False if Docker reported an error,
+            or None if the socket isn't accessible and the caller should
+            fall back to docker compose
+        """
+        repo, _, tag = DOCKGE_IMAGE.partition(":")
+        query = urlencode({"fromImage": repo, "tag": tag or "latest"})
+        result = unix_fetch(DOCKER_SOCKET, "POST", f"/images/create?{query}", _PULL_TIMEOUT)
+        if result is None:
+            return None
+        status, body = result
+        # Failures mid-pull still answer 200, with an "error" progress line
+        return status == 200 and b'"error"' not in body
 
     def start(self) -> bool:
         """Start Dockge.
@@ -202,11 +354,14 @@ services:
             print_error("Dockge is not installed.")
             return False
 
-        # Use sudo since user may not have docker group yet
-        success, _, _ = run_sudo([
-            "docker", "compose", "-f", str(self.dockge_dir / "compose.yaml"),
-            "up", "-d"
-        ], show_command=False)
+        success = self._container_action("start")
+        if not success:
+            # Container missing or socket not accessible: use sudo since
+            # user may not have docker group yet
+            success, _, _ = run_sudo([
+                "docker", "compose", "-f", self._compose_path,
+                "up", "-d"
+            ], show_command=False)
 
         if success:
             print_success("Dockge started.")
@@ -225,10 +380,12 @@ services:
             print_error("Dockge is not installed.")
             return False
 
-        success, _, _ = run_sudo([
-            "docker", "compose", "-f", str(self.dockge_dir / "compose.yaml"),
-            "down"
-        ], show_command=False)
+        success = self._container_action("stop")
+        if not success:
+            success, _, _ = run_sudo([
+                "docker", "compose", "-f", self._compose_path,
+                "down"
+            ], show_command=False)
 
         if success:
             print_success("Dockge stopped.")
@@ -256,16 +413,8 @@ services:
         if self.is_running():
             print_success("Dockge is running.")
 
-            # Get port from compose file
-            try:
-                compose_file = self.dockge_dir / "compose.yaml"
-                content = compose_file.read_text()
-                import re
-                match = re.search(r'"(\d+):5001"', content)
-                port = match.group(1) if match else "5001"
-                console.print(f"\n[bold]Access URL:[/bold] http://localhost:{port}")
-            except:
-                pass
+            port = self._get_port()
+            console.print(f"\n[bold]Access URL:[/bold] http://localhost:{port}")
         else:
             print_warning("Dockge is not running.")
             if confirm("Start now?"):
@@ -288,15 +437,28 @@ services:
             pause()
             return False
 
+        image_before = self._get_image_id()
+
         console.print("[dim]Pulling latest image...[/dim]")
-        run_sudo([
-            "docker", "compose", "-f", str(self.dockge_dir / "compose.yaml"),
-            "pull"
-        ], show_command=False)
+        success = self._pull_image()
+        if success is None:
+            # Socket not accessible: use sudo since user may not have
+            # docker group yet
+            success, _, _ = run_sudo([
+                "docker", "compose", "-f", self._compose_path,
+                "pull"
+            ], show_command=False)
+
+        # Nothing new was pulled, so a restart would be a no-op
+        up_to_date = success and image_before and image_before == self._get_image_id()
+        if up_to_date and self.is_running():
+            print_success("Dockge is already up to date.")
+            pause()
+            return True
 
         console.print("[dim]Restarting Dockge...[/dim]")
         success, _, _ = run_sudo([
-            "docker", "compose", "-f", str(self.dockge_dir / "compose.yaml"),
+            "docker", "compose", "-f", self._compose_path,
             "up", "-d"
         ], show_command=False)
 
@@ -328,18 +490,22 @@ services:
         if not confirm("Proceed with uninstall?"):
             return False
 
-        # Stop Dockge
-        self.stop()
-
-        # Remove container and image
-        run_sudo(["docker", "rm", "dockge"], show_command=False)
-        run_sudo(["docker", "rmi", "louislam/dockge:1"], show_command=False)
+        # Take the compose project down (container and its dockge_default
+        # network), then remove any leftover container and the image
+        run_sudo_batch([
+            ["docker", "compose", "-f", self._compose_path, "down"],
+            ["docker", "rm", "-f", DOCKGE_CONTAINER],
+            ["docker", "rmi", DOCKGE_IMAGE],
+        ], show_command=False, stop_on_error=False)
 
         # Remove Dockge directory
         if confirm("Remove Dockge data directory?"):
             run_sudo(["rm", "-rf", str(self.dockge_dir)])
             print_success("Dockge data removed.")
 
+        # compose.yaml may or may not still exist; re-check on next use
+        self._installed = None
+
         print_success("Dockge uninstalled.")
         pause()
         return True
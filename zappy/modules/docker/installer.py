@@ -1,8 +1,27 @@
 """Docker installation and management."""
 
+import errno
+import io
 import os
-from ...utils.command import run_sudo, run_command, check_command_exists, write_file_sudo
-from ...utils.distro import detect_distro, PackageManager
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Optional, Sequence
+
+from ...config import DOCKER_SOCKET
+from ...utils.command import (
+    as_root,
+    run_sudo,
+    run_command,
+    run_many,
+    run_command_streaming,
+    run_sudo_streaming,
+    check_command_exists,
+    clear_command_cache,
+    write_file_sudo,
+)
+from ...utils.distro import detect_distro, get_os_release, PackageManager
+from ...utils.http import download
 from ...utils.ui import (
     console,
     print_success,
@@ -15,6 +34,39 @@ from ...utils.ui import (
     print_header,
 )
 
+DOCKER_APT_KEYRING = "/etc/apt/keyrings/docker.asc"
+
+# Distro-packaged Docker that conflicts with docker-ce
+_OLD_DEBIAN_PACKAGES = ("docker", "docker-engine", "docker.io", "containerd", "runc")
+
+
+@lru_cache(maxsize=1)
+def _dpkg_architecture() -> str:
+    """Get the Debian architecture name (amd64, arm64, ...) once per session."""
+    _, stdout, _ = run_command(["dpkg", "--print-architecture"])
+    return stdout.strip()
+
+
+def _installed_debs(packages: Sequence[str]) -> List[str]:
+    """Filter package names down to those dpkg reports as installed."""
+    # Unknown names make dpkg-query exit 1 but the rest are still listed
+    _, stdout, _ = run_command(
+        ["dpkg-query", "-W", "-f=${Status} ${Package}\n"] + list(packages)
+    )
+    return [
+        line.rsplit(" ", 1)[1]
+        for line in stdout.splitlines()
+        if line.startswith("install ok installed ")
+    ]
+
+
+def _fetch_text(url: str) -> Optional[str]:
+    """Download a small text resource (e.g. an armored GPG key) into memory."""
+    buf = io.BytesIO()
+    if not download(url, buf):
+        return None
+    return buf.getvalue().decode("ascii", errors="replace")
+
 
 class DockerInstaller:
     """Manages Docker installation."""
@@ -33,9 +85,23 @@ class DockerInstaller:
         Returns:
             True if running, False otherwise
         """
+        # Fast path: the daemon accepts connections on its socket
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(0.2)
+        try:
+            sock.connect(DOCKER_SOCKET)
+            return True
+        except OSError as e:
+            # No socket file (e.g. rootless Docker) or no permission to
+            # the socket yet: ask the docker CLI instead
+            if e.errno not in (errno.ENOENT, errno.EACCES, errno.EPERM):
+                return False
+        finally:
+            sock.close()
+
         # Try without sudo first
-        success, _, _ = run_command(["docker", "info"])
-        if success:
+        returncode, _, _ = run_command(["docker", "info"])
+        if returncode == 0:
             return True
 
         # Try with sudo (needed before user logs out/in after install)
@@ -72,6 +138,10 @@ class DockerInstaller:
             pause()
             return False
 
+        # The install removes old docker packages first, so a cached "docker"
+        # hit may be stale if the new packages failed to go in
+        clear_command_cache()
+
         if success:
             self._post_install()
             print_success("Docker installed successfully!")
@@ -88,28 +158,6 @@ class DockerInstaller:
         """
         console.print("\n[bold]Installing Docker on Debian/Ubuntu...[/bold]\n")
 
-        # Remove old versions
-        console.print("[dim]Removing old Docker versions...[/dim]")
-        run_sudo([
-            "apt", "remove", "-y",
-            "docker", "docker-engine", "docker.io", "containerd", "runc"
-        ], show_command=False)
-
-        # Install prerequisites
-        console.print("[dim]Installing prerequisites...[/dim]")
-        success, _, _ = run_sudo([
-            "apt", "install", "-y",
-            "ca-certificates", "curl", "gnupg", "lsb-release"
-        ])
-        if not success:
-            print_error("Failed to install prerequisites.")
-            return False
-
-        # Add Docker GPG key
-        console.print("[dim]Adding Docker GPG key...[/dim]")
-        run_sudo(["mkdir", "-p", "/etc/apt/keyrings"])
-
-        # Download and add key
         distro = detect_distro()
         if distro.id == "ubuntu":
             key_url = "https://download.docker.com/linux/ubuntu/gpg"
@@ -118,30 +166,58 @@ class DockerInstaller:
             key_url = "https://download.docker.com/linux/debian/gpg"
             repo_url = "https://download.docker.com/linux/debian"
 
-        success, _, _ = run_command([
-            "bash", "-c",
-            f"curl -fsSL {key_url} | sudo gpg --dearmor -o /etc/apt/keyrings/docker.gpg"
-        ])
+        # Fetch the GPG key while apt works through the package steps below.
+        # apt holds the dpkg lock, so those steps themselves stay sequential.
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            key_future = pool.submit(_fetch_text, key_url)
+
+            # Remove old versions in the same apt transaction as the
+            # prerequisites ("pkg-" means remove). Only names dpkg reports
+            # as installed are listed, since unknown ones abort apt-get.
+            old_packages = _installed_debs(_OLD_DEBIAN_PACKAGES)
+            if old_packages:
+                console.print("[dim]Removing old Docker versions...[/dim]")
+
+            console.print("[dim]Installing prerequisites...[/dim]")
+            success, _, _ = run_sudo(
+                ["apt-get", "install", "-y", "ca-certificates", "curl"]
+                + [f"{pkg}-" for pkg in old_packages]
+            )
+            if not success:
+                print_error("Failed to install prerequisites.")
+                return False
+
+            key = key_future.result()
 
-        run_sudo(["chmod", "a+r", "/etc/apt/keyrings/docker.gpg"])
+        # Add Docker GPG key
+        console.print("[dim]Adding Docker GPG key...[/dim]")
+        if key is None:
+            # The early fetch can fail on hosts that lacked ca-certificates
+            key = _fetch_text(key_url)
+        if key is None:
+            print_error("Failed to download Docker GPG key.")
+            return False
+        run_sudo(["mkdir", "-p", "/etc/apt/keyrings"])
+
+        # apt reads ASCII-armored keys directly, so no gpg --dearmor step
+        if not write_file_sudo(DOCKER_APT_KEYRING, key):
+            print_error("Failed to add Docker GPG key.")
+            return False
 
         # Add repository
         console.print("[dim]Adding Docker repository...[/dim]")
-        _, arch_out, _ = run_command(["dpkg", "--print-architecture"])
-        arch = arch_out.strip()
-
-        _, codename_out, _ = run_command(["bash", "-c", ". /etc/os-release && echo $VERSION_CODENAME"])
-        codename = codename_out.strip()
+        arch = _dpkg_architecture()
+        codename = get_os_release().get("VERSION_CODENAME", "")
 
-        repo_line = f"deb [arch={arch} signed-by=/etc/apt/keyrings/docker.gpg] {repo_url} {codename} stable"
+        repo_line = f"deb [arch={arch} signed-by={DOCKER_APT_KEYRING}] {repo_url} {codename} stable"
 
         write_file_sudo("/etc/apt/sources.list.d/docker.list", repo_line + "\n")
 
         # Install Docker
         console.print("[dim]Installing Docker packages...[/dim]")
-        run_sudo(["apt", "update"])
-        success, _, _ = run_sudo([
-            "apt", "install", "-y",
+        run_sudo(["apt-get", "update"])
+        success, _ = run_sudo_streaming([
+            "apt-get", "install", "-y",
             "docker-ce", "docker-ce-cli", "containerd.io",
             "docker-buildx-plugin", "docker-compose-plugin"
         ])
@@ -182,7 +258,7 @@ class DockerInstaller:
 
         # Install Docker
         console.print("[dim]Installing Docker packages...[/dim]")
-        success, _, _ = run_sudo([
+        success, _ = run_sudo_streaming([
             "dnf", "install", "-y",
             "docker-ce", "docker-ce-cli", "containerd.io",
             "docker-buildx-plugin", "docker-compose-plugin"
@@ -198,7 +274,7 @@ class DockerInstaller:
         """
         console.print("\n[bold]Installing Docker on Arch Linux...[/bold]\n")
 
-        success, _, _ = run_sudo([
+        success, _ = run_sudo_streaming([
             "pacman", "-S", "--noconfirm",
             "docker", "docker-compose"
         ])
@@ -210,8 +286,7 @@ class DockerInstaller:
         console.print("\n[dim]Performing post-installation steps...[/dim]")
 
         # Start and enable Docker
-        run_sudo(["systemctl", "enable", "docker"])
-        run_sudo(["systemctl", "start", "docker"])
+        run_sudo(["systemctl", "enable", "--now", "docker"])
 
         # Add current user to docker group
         username = os.environ.get("SUDO_USER") or os.environ.get("USER")
@@ -222,9 +297,12 @@ class DockerInstaller:
 
     def _show_version(self):
         """Display Docker version."""
+        version, compose = run_many([
+            ["docker", "--version"],
+            ["docker", "compose", "version"],
+        ])
         console.print("\n[bold]Docker Version:[/bold]")
-        run_command(["docker", "--version"])
-        run_command(["docker", "compose", "version"])
+        console.print(version[1] + compose[1], end="", markup=False)
 
     def show_status(self) -> bool:
         """Show Docker status.
@@ -242,16 +320,22 @@ class DockerInstaller:
             pause()
             return False
 
-        # Show version
-        self._show_version()
+        # The probes are independent, so gather them together and print in order
+        version, compose, status, containers = run_many([
+            ["docker", "--version"],
+            ["docker", "compose", "version"],
+            as_root(["systemctl", "status", "docker", "--no-pager", "-l"]),
+            ["docker", "ps"],
+        ])
+
+        console.print("\n[bold]Docker Version:[/bold]")
+        console.print(version[1] + compose[1], end="", markup=False)
 
-        # Show service status
         console.print("\n[bold]Service Status:[/bold]")
-        run_sudo(["systemctl", "status", "docker", "--no-pager", "-l"])
+        console.print(status[1], end="", markup=False)
 
-        # Show running containers
         console.print("\n[bold]Running Containers:[/bold]")
-        run_command(["docker", "ps"])
+        console.print(containers[1] or containers[2], end="", markup=False)
 
         pause()
         return True
@@ -270,6 +354,6 @@ class DockerInstaller:
             pause()
             return False
 
-        run_command(["docker", "info"])
+        run_command_streaming(["docker", "info"])
         pause()
         return True
@@ -1,10 +1,22 @@
 """Firewall management with UFW and firewalld support."""
 
+import json
+import shutil
+import time
 from enum import Enum
+from pathlib import Path
 from typing import List, Optional, Tuple
 from dataclasses import dataclass
 
-from ...utils.command import run_sudo, run_command, check_command_exists
+from ...config import FIREWALL_CACHE_FILE, FIREWALL_CACHE_TTL
+from ...utils.command import (
+    as_root,
+    run_sudo,
+    run_sudo_batch,
+    run_command,
+    run_many,
+    check_command_exists,
+)
 from ...utils.ui import (
     console,
     print_success,
@@ -21,6 +33,20 @@ from ...utils.ui import (
 from ...utils.validators import validate_port
 
 
+# Predefined services offered by allow_service: (label, service, port)
+_SERVICES: Tuple[Tuple[str, Optional[str], Optional[int]], ...] = (
+    ("SSH", "ssh", 22),
+    ("HTTP", "http", 80),
+    ("HTTPS", "https", 443),
+    ("MySQL", "mysql", 3306),
+    ("PostgreSQL", "postgresql", 5432),
+    ("Custom port...", None, None),
+)
+_SERVICE_LABELS = tuple(
+    f"{label} (port {port})" if port else label for label, _, port in _SERVICES
+)
+
+
 class FirewallType(Enum):
     """Supported firewall types."""
     UFW = "ufw"
@@ -41,6 +67,8 @@ class FirewallManager:
     """Manages firewall rules (UFW or firewalld)."""
 
     def __init__(self):
+        # Keep construction free of probes; detection runs on first
+        # access to firewall_type
         self._type: Optional[FirewallType] = None
 
     @property
@@ -49,30 +77,90 @@ class FirewallManager:
         if self._type is not None:
             return self._type
 
+        cached = self._load_cached_type()
+        if cached is not None:
+            self._type = cached
+            return self._type
+
+        self._type = self._detect_type()
+        self._save_cached_type(self._type)
+        return self._type
+
+    def _detect_type(self) -> FirewallType:
+        """Probe the system for an installed firewall.
+
+        Returns:
+            Detected firewall type
+        """
         # Check for UFW first (common on Debian/Ubuntu)
         if check_command_exists("ufw"):
             # Check if UFW is active
-            _, stdout, _ = run_command(["sudo", "ufw", "status"])
+            _, stdout, _ = run_command(as_root(["ufw", "status"]))
             if "active" in stdout.lower():
-                self._type = FirewallType.UFW
-                return self._type
+                return FirewallType.UFW
 
         # Check for firewalld (common on RHEL/Fedora)
         if check_command_exists("firewall-cmd"):
-            _, stdout, _ = run_command(["sudo", "firewall-cmd", "--state"])
+            _, stdout, _ = run_command(as_root(["firewall-cmd", "--state"]))
             if "running" in stdout.lower():
-                self._type = FirewallType.FIREWALLD
-                return self._type
+                return FirewallType.FIREWALLD
 
         # Default based on command availability
         if check_command_exists("ufw"):
-            self._type = FirewallType.UFW
+            return FirewallType.UFW
         elif check_command_exists("firewall-cmd"):
-            self._type = FirewallType.FIREWALLD
-        else:
-            self._type = FirewallType.NONE
+            return FirewallType.FIREWALLD
+        return FirewallType.NONE
 
-        return self._type
+    def _load_cached_type(self) -> Optional[FirewallType]:
+        """Load the firewall type detected by a previous run.
+
+        Returns:
+            Cached firewall type, or None if missing, expired or stale
+        """
+        try:
+            data = json.loads(FIREWALL_CACHE_FILE.read_text())
+            if time.time() - data["ts"] >= FIREWALL_CACHE_TTL:
+                return None
+            # The binary we detected must still be installed
+            if not Path(data["probe"]).exists():
+                return None
+            return FirewallType(data["type"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _save_cached_type(self, fw_type: FirewallType):
+        """Persist the detected firewall type for later runs.
+
+        Args:
+            fw_type: Detected firewall type
+        """
+        # Don't cache "none" so a freshly installed firewall is picked up
+        if fw_type == FirewallType.NONE:
+            return
+
+        binary = "ufw" if fw_type == FirewallType.UFW else "firewall-cmd"
+        probe = shutil.which(binary)
+        if probe is None:
+            return
+
+        try:
+            FIREWALL_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            FIREWALL_CACHE_FILE.write_text(json.dumps({
+                "type": fw_type.value,
+                "ts": time.time(),
+                "probe": probe,
+            }))
+        except OSError:
+            pass
+
+    def _invalidate_cache(self):
+        """Forget the detected firewall type after its state changes."""
+        self._type = None
+        try:
+            FIREWALL_CACHE_FILE.unlink(missing_ok=True)
+        except OSError:
+            pass
 
     def show_status(self) -> bool:
         """Show current firewall status.
@@ -130,13 +218,16 @@ class FirewallManager:
             return False
 
         if fw_type == FirewallType.UFW:
-            # Allow SSH before enabling
-            run_sudo(["ufw", "allow", "ssh"], show_command=False)
-            success, _, _ = run_sudo(["ufw", "--force", "enable"])
+            # Allow SSH before enabling; never enable if that step fails
+            success, _, _ = run_sudo_batch([
+                ["ufw", "allow", "ssh"],
+                ["ufw", "--force", "enable"],
+            ])
         else:
             success, _, _ = run_sudo(["systemctl", "enable", "--now", "firewalld"])
 
         if success:
+            self._invalidate_cache()
             print_success("Firewall enabled.")
         else:
             print_error("Failed to enable firewall.")
@@ -166,6 +257,7 @@ class FirewallManager:
             success, _, _ = run_sudo(["systemctl", "disable", "--now", "firewalld"])
 
         if success:
+            self._invalidate_cache()
             print_success("Firewall disabled.")
         else:
             print_error("Failed to disable firewall.")
@@ -238,37 +330,19 @@ class FirewallManager:
                 return False
             protocol = ["tcp", "udp", "both"][choice]
 
-        success = False
+        rules = [f"{port}/tcp", f"{port}/udp"] if protocol == "both" else [f"{port}/{protocol}"]
 
         if fw_type == FirewallType.UFW:
-            if protocol == "tcp":
-                success, _, _ = run_sudo(["ufw", "allow", f"{port}/tcp"], show_command=not silent)
-            elif protocol == "udp":
-                success, _, _ = run_sudo(["ufw", "allow", f"{port}/udp"], show_command=not silent)
-            else:  # both
-                success1, _, _ = run_sudo(["ufw", "allow", f"{port}/tcp"], show_command=not silent)
-                success2, _, _ = run_sudo(["ufw", "allow", f"{port}/udp"], show_command=not silent)
-                success = success1 and success2
+            # ufw takes one rule per call; batch them under a single sudo
+            success, _, _ = run_sudo_batch(
+                [["ufw", "allow", rule] for rule in rules],
+                show_command=not silent,
+            )
         else:  # firewalld
-            if protocol == "tcp":
-                success, _, _ = run_sudo([
-                    "firewall-cmd", "--add-port", f"{port}/tcp", "--permanent"
-                ], show_command=not silent)
-            elif protocol == "udp":
-                success, _, _ = run_sudo([
-                    "firewall-cmd", "--add-port", f"{port}/udp", "--permanent"
-                ], show_command=not silent)
-            else:  # both
-                success1, _, _ = run_sudo([
-                    "firewall-cmd", "--add-port", f"{port}/tcp", "--permanent"
-                ], show_command=not silent)
-                success2, _, _ = run_sudo([
-                    "firewall-cmd", "--add-port", f"{port}/udp", "--permanent"
-                ], show_command=not silent)
-                success = success1 and success2
-
-            if success:
-                run_sudo(["firewall-cmd", "--reload"], show_command=False)
+            success, _, _ = run_sudo_batch([
+                ["firewall-cmd", *(f"--add-port={rule}" for rule in rules), "--permanent"],
+                ["firewall-cmd", "--reload"],
+            ], show_command=not silent)
 
         if not silent:
             if success:
@@ -306,37 +380,18 @@ class FirewallManager:
         if choice is None:
             return False
 
-        success = False
+        protocol = ["tcp", "udp", "both"][choice]
+        rules = [f"{port}/tcp", f"{port}/udp"] if protocol == "both" else [f"{port}/{protocol}"]
 
         if fw_type == FirewallType.UFW:
-            if choice == 0:  # TCP
-                success, _, _ = run_sudo(["ufw", "delete", "allow", f"{port}/tcp"])
-            elif choice == 1:  # UDP
-                success, _, _ = run_sudo(["ufw", "delete", "allow", f"{port}/udp"])
-            else:  # Both
-                success1, _, _ = run_sudo(["ufw", "delete", "allow", f"{port}/tcp"])
-                success2, _, _ = run_sudo(["ufw", "delete", "allow", f"{port}/udp"])
-                success = success1 and success2
+            success, _, _ = run_sudo_batch(
+                [["ufw", "delete", "allow", rule] for rule in rules]
+            )
         else:  # firewalld
-            if choice == 0:  # TCP
-                success, _, _ = run_sudo([
-                    "firewall-cmd", "--remove-port", f"{port}/tcp", "--permanent"
-                ])
-            elif choice == 1:  # UDP
-                success, _, _ = run_sudo([
-                    "firewall-cmd", "--remove-port", f"{port}/udp", "--permanent"
-                ])
-            else:  # Both
-                success1, _, _ = run_sudo([
-                    "firewall-cmd", "--remove-port", f"{port}/tcp", "--permanent"
-                ])
-                success2, _, _ = run_sudo([
-                    "firewall-cmd", "--remove-port", f"{port}/udp", "--permanent"
-                ])
-                success = success1 and success2
-
-            if success:
-                run_sudo(["firewall-cmd", "--reload"], show_command=False)
+            success, _, _ = run_sudo_batch([
+                ["firewall-cmd", *(f"--remove-port={rule}" for rule in rules), "--permanent"],
+                ["firewall-cmd", "--reload"],
+            ])
 
         if success:
             print_success(f"Port {port} closed.")
@@ -361,37 +416,25 @@ class FirewallManager:
             pause()
             return False
 
-        services = [
-            ("SSH", "ssh", 22),
-            ("HTTP", "http", 80),
-            ("HTTPS", "https", 443),
-            ("MySQL", "mysql", 3306),
-            ("PostgreSQL", "postgresql", 5432),
-            ("Custom port...", None, None),
-        ]
-
-        items = [f"{s[0]} (port {s[2]})" if s[2] else s[0] for s in services]
-        choice = select_from_list(items, "Select service:")
+        choice = select_from_list(list(_SERVICE_LABELS), "Select service:")
         if choice is None:
             return False
 
-        if services[choice][1] is None:
+        label, service_name, _ = _SERVICES[choice]
+        if service_name is None:
             # Custom port
             return self.open_port()
 
-        service_name = services[choice][1]
-
         if fw_type == FirewallType.UFW:
             success, _, _ = run_sudo(["ufw", "allow", service_name])
         else:
-            success, _, _ = run_sudo([
-                "firewall-cmd", "--add-service", service_name, "--permanent"
+            success, _, _ = run_sudo_batch([
+                ["firewall-cmd", "--add-service", service_name, "--permanent"],
+                ["firewall-cmd", "--reload"],
             ])
-            if success:
-                run_sudo(["firewall-cmd", "--reload"], show_command=False)
 
         if success:
-            print_success(f"Service '{services[choice][0]}' allowed.")
+            print_success(f"Service '{label}' allowed.")
         else:
             print_error(f"Failed to allow service.")
 
@@ -419,13 +462,14 @@ class FirewallManager:
                 show_command=False
             )
         else:
+            (_, services, _), (returncode, stdout, _) = run_many([
+                as_root(["firewall-cmd", "--list-services"]),
+                as_root(["firewall-cmd", "--list-ports"]),
+            ])
+            success = returncode == 0
             console.print("[bold]Services:[/bold]")
-            run_sudo(["firewall-cmd", "--list-services"], show_command=False)
+            console.print(services)
             console.print("\n[bold]Ports:[/bold]")
-            success, stdout, _ = run_sudo(
-                ["firewall-cmd", "--list-ports"],
-                show_command=False
-            )
 
         console.print(stdout)
         pause()
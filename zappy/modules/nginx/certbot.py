@@ -1,12 +1,19 @@
 """Certbot SSL certificate management."""
 
 import os
+import re
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Callable, List, Optional, Tuple
 from dataclasses import dataclass
 
-from ...config import CERTBOT_EMAIL_FILE
-from ...utils.command import run_sudo, run_command, check_command_exists
+from ...config import CERTBOT_EMAIL_FILE, LETSENCRYPT_RENEWAL_DIR
+from ...utils.command import (
+    run_sudo,
+    run_sudo_lines,
+    run_sudo_streaming,
+    run_command,
+    check_command_exists,
+)
 from ...utils.ui import (
     console,
     print_success,
@@ -16,6 +23,7 @@ from ...utils.ui import (
     confirm,
     prompt,
     select_from_list,
+    multi_select_from_list,
     pause,
     clear_screen,
     print_header,
@@ -25,6 +33,18 @@ from ...utils.validators import validate_email
 from .manager import NginxManager
 from ..firewall import FirewallManager
 
+# One pass over `certbot certificates` output; each match sets one field
+_CERT_RE = re.compile(
+    r"^\s*Certificate Name:\s*(?P<name>.+)$"
+    r"|^\s*Domains:\s*(?P<domains>.+)$"
+    r"|^\s*Expiry Date:\s*(?P<expiry>.+)$"
+    r"|^\s*Certificate Path:\s*(?P<path>.+)$",
+    re.MULTILINE,
+)
+
+# Where distro packages, snap and pip put certbot; checked before a PATH scan
+_CERTBOT_PATHS = ("/usr/bin/certbot", "/snap/bin/certbot", "/usr/local/bin/certbot")
+
 
 @dataclass
 class CertificateInfo:
@@ -38,28 +58,44 @@ class CertificateInfo:
 class CertbotManager:
     """Manages SSL certificates via Certbot."""
 
-    def __init__(self):
-        self.nginx_manager = NginxManager()
+    def __init__(self, nginx_manager: Optional[NginxManager] = None):
+        # Pass the app's NginxManager so its domain cache sees the config
+        # changes made here; otherwise one is built on first access
+        self._nginx_manager = nginx_manager
         self.firewall = FirewallManager()
         self._email: Optional[str] = None
+        # Set once the email file has been looked for, found or not
+        self._email_checked = False
+        # Only a positive result is remembered; certbot may be installed later
+        self._installed = False
+        # Parsed `certbot certificates` output, keyed by renewal dir mtime
+        self._cert_cache: Optional[Tuple[float, List[CertificateInfo]]] = None
+
+    @property
+    def nginx_manager(self) -> NginxManager:
+        """Get the nginx manager, creating it on first use."""
+        if self._nginx_manager is None:
+            self._nginx_manager = NginxManager()
+        return self._nginx_manager
 
     @property
     def email(self) -> Optional[str]:
         """Get the stored Certbot email."""
-        if self._email:
+        if self._email or self._email_checked:
             return self._email
 
-        email_file = Path(CERTBOT_EMAIL_FILE)
-        if email_file.exists():
-            self._email = email_file.read_text().strip()
-            return self._email
-
-        return None
+        self._email_checked = True
+        try:
+            self._email = Path(CERTBOT_EMAIL_FILE).read_text().strip() or None
+        except OSError:
+            pass
+        return self._email
 
     @email.setter
     def email(self, value: str):
         """Store the Certbot email."""
         self._email = value
+        self._email_checked = True
         email_file = Path(CERTBOT_EMAIL_FILE)
         email_file.parent.mkdir(parents=True, exist_ok=True)
         email_file.write_text(value)
@@ -70,7 +106,14 @@ class CertbotManager:
         Returns:
             True if installed, False otherwise
         """
-        return check_command_exists("certbot")
+        if self._installed:
+            return True
+
+        self._installed = (
+            any(os.access(path, os.X_OK) for path in _CERTBOT_PATHS)
+            or check_command_exists("certbot")
+        )
+        return self._installed
 
     def _get_email(self) -> Optional[str]:
         """Get or prompt for Certbot email.
@@ -211,6 +254,9 @@ class CertbotManager:
         success, stdout, stderr = run_sudo(cmd, show_command=True)
 
         if success:
+            self._cert_cache = None
+            # Certbot rewrites the site config in place
+            self.nginx_manager.invalidate()
             print_success(f"HTTPS enabled for {domain.name}!")
             print_info("Certificate will auto-renew via systemd timer.")
         else:
@@ -236,58 +282,20 @@ class CertbotManager:
             pause()
             return []
 
-        success, stdout, stderr = run_sudo(
-            ["certbot", "certificates"],
-            show_command=False
-        )
+        def show(cert: CertificateInfo):
+            console.print(f"\n[bold cyan]{cert.name}[/bold cyan]")
+            console.print(f"  Domains: {', '.join(cert.domains)}")
+            console.print(f"  Expires: {cert.expiry}")
+            console.print(f"  Path: {cert.path}")
 
-        if not success:
+        certs = self._load_certificates(on_cert=show)
+        if certs is None:
             print_error("Failed to list certificates.")
             pause()
             return []
 
-        # Parse output
-        certs = []
-        current_cert = {}
-
-        for line in stdout.split("\n"):
-            line = line.strip()
-
-            if line.startswith("Certificate Name:"):
-                if current_cert:
-                    certs.append(CertificateInfo(
-                        name=current_cert.get("name", ""),
-                        domains=current_cert.get("domains", []),
-                        expiry=current_cert.get("expiry", ""),
-                        path=current_cert.get("path", ""),
-                    ))
-                current_cert = {"name": line.split(":", 1)[1].strip()}
-
-            elif line.startswith("Domains:"):
-                current_cert["domains"] = line.split(":", 1)[1].strip().split()
-
-            elif line.startswith("Expiry Date:"):
-                current_cert["expiry"] = line.split(":", 1)[1].strip()
-
-            elif line.startswith("Certificate Path:"):
-                current_cert["path"] = line.split(":", 1)[1].strip()
-
-        if current_cert:
-            certs.append(CertificateInfo(
-                name=current_cert.get("name", ""),
-                domains=current_cert.get("domains", []),
-                expiry=current_cert.get("expiry", ""),
-                path=current_cert.get("path", ""),
-            ))
-
         if not certs:
             print_warning("No certificates found.")
-        else:
-            for cert in certs:
-                console.print(f"\n[bold cyan]{cert.name}[/bold cyan]")
-                console.print(f"  Domains: {', '.join(cert.domains)}")
-                console.print(f"  Expires: {cert.expiry}")
-                console.print(f"  Path: {cert.path}")
 
         pause()
         return certs
@@ -308,7 +316,7 @@ class CertbotManager:
 
         options = [
             "Renew all certificates (recommended)",
-            "Renew specific certificate",
+            "Renew specific certificates",
             "Dry run (test renewal)",
         ]
 
@@ -319,7 +327,7 @@ class CertbotManager:
         if choice == 0:
             # Renew all
             console.print("\n[dim]Renewing all certificates...[/dim]\n")
-            success, stdout, stderr = run_sudo(["certbot", "renew"])
+            success, _ = run_sudo_streaming(["certbot", "renew"])
 
         elif choice == 1:
             # Renew specific
@@ -329,30 +337,43 @@ class CertbotManager:
                 pause()
                 return False
 
-            cert_choice = select_from_list(certs, "Select certificate to renew:")
-            if cert_choice is None:
+            cert_choices = multi_select_from_list(
+                certs,
+                title="Select certificates to renew",
+                special_keywords={"all": list(range(len(certs)))},
+            )
+            if cert_choices is None:
+                return False
+
+            if not cert_choices:
+                print_warning("No certificates selected.")
+                pause()
                 return False
 
-            console.print(f"\n[dim]Renewing {certs[cert_choice]}...[/dim]\n")
-            success, stdout, stderr = run_sudo([
-                "certbot", "renew",
-                "--cert-name", certs[cert_choice]
-            ])
+            selected = [certs[i] for i in cert_choices]
+            if len(selected) == len(certs):
+                # Certbot takes one --cert-name per run; a plain renew
+                # covers every certificate in a single startup
+                console.print("\n[dim]Renewing all selected certificates...[/dim]\n")
+                success, _ = run_sudo_streaming(["certbot", "renew"])
+            else:
+                success = True
+                for name in selected:
+                    console.print(f"\n[dim]Renewing {name}...[/dim]\n")
+                    ok, _ = run_sudo_streaming(["certbot", "renew", "--cert-name", name])
+                    success = success and ok
 
         else:
             # Dry run
             console.print("\n[dim]Testing certificate renewal (dry run)...[/dim]\n")
-            success, stdout, stderr = run_sudo(["certbot", "renew", "--dry-run"])
+            success, _ = run_sudo_streaming(["certbot", "renew", "--dry-run"])
 
         if success:
+            self._cert_cache = None
             print_success("Certificate renewal completed.")
         else:
             print_error("Certificate renewal failed.")
 
-        console.print(stdout)
-        if stderr:
-            console.print(f"[dim]{stderr}[/dim]")
-
         pause()
         return success
 
@@ -397,6 +418,7 @@ class CertbotManager:
         ])
 
         if success:
+            self._cert_cache = None
             print_success(f"Certificate '{cert_name}' deleted.")
             print_warning("Remember to update your nginx configuration!")
         else:
@@ -406,26 +428,75 @@ class CertbotManager:
         pause()
         return success
 
-    def _get_certificate_names(self) -> List[str]:
-        """Get list of certificate names.
+    def _load_certificates(
+        self,
+        on_cert: Optional[Callable[[CertificateInfo], None]] = None,
+    ) -> Optional[List[CertificateInfo]]:
+        """Get parsed certificates, reusing the last `certbot certificates` run.
+
+        Certbot rewrites a file under the renewal directory whenever a
+        certificate is issued, renewed or deleted, so its mtime tells
+        whether the cached list is still current. Output is parsed line
+        by line as certbot prints it.
+
+        Args:
+            on_cert: Optional callback, called with each certificate as
+                soon as it is complete
 
         Returns:
-            List of certificate names
+            List of CertificateInfo objects, or None if certbot failed
         """
-        success, stdout, stderr = run_sudo(
-            ["certbot", "certificates"],
-            show_command=False
-        )
+        try:
+            mtime = os.stat(LETSENCRYPT_RENEWAL_DIR).st_mtime
+        except OSError:
+            mtime = None
+
+        if mtime is not None and self._cert_cache and self._cert_cache[0] == mtime:
+            if on_cert:
+                for cert in self._cert_cache[1]:
+                    on_cert(cert)
+            return self._cert_cache[1]
+
+        certs: List[CertificateInfo] = []
+        current_cert = {}
 
-        if not success:
-            return []
+        def flush():
+            if current_cert:
+                cert = CertificateInfo(**current_cert)
+                certs.append(cert)
+                if on_cert:
+                    on_cert(cert)
+
+        def on_line(line: str):
+            match = _CERT_RE.match(line)
+            if match is None:
+                return
+
+            field = match.lastgroup
+            value = match.group(field).strip()
+
+            if field == "name":
+                flush()
+                current_cert.clear()
+                current_cert.update(name=value, domains=[], expiry="", path="")
+            elif current_cert:
+                current_cert[field] = value.split() if field == "domains" else value
+
+        if not run_sudo_lines(["certbot", "certificates"], on_line):
+            return None
+        flush()
+
+        # Without a readable renewal dir there is nothing to validate against
+        self._cert_cache = (mtime, certs) if mtime is not None else None
+        return certs
 
-        names = []
-        for line in stdout.split("\n"):
-            if line.strip().startswith("Certificate Name:"):
-                names.append(line.split(":", 1)[1].strip())
+    def _get_certificate_names(self) -> List[str]:
+        """Get list of certificate names.
 
-        return names
+        Returns:
+            List of certificate names
+        """
+        return [cert.name for cert in self._load_certificates() or []]
 
     def check_renewal_timer(self) -> bool:
         """Check the status of the certbot renewal timer.
@@ -436,11 +507,10 @@ class CertbotManager:
         clear_screen()
         print_header("Renewal Timer Status")
 
-        success, stdout, stderr = run_sudo(
+        success, _ = run_sudo_streaming(
             ["systemctl", "status", "certbot.timer", "--no-pager"],
-            show_command=False
+            show_command=False,
         )
 
-        console.print(stdout or stderr)
         pause()
         return success
@@ -1,17 +1,34 @@
 """Nginx domain management."""
 
+import glob
+import hashlib
+import json
 import os
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Iterator, List, Optional, Tuple
 from dataclasses import dataclass
 
 from ...config import (
     NGINX_SITES_AVAILABLE,
     NGINX_SITES_ENABLED,
+    NGINX_CONF,
+    NGINX_GOOD_CONFIGS_FILE,
     get_backup_path,
     ensure_backup_dir,
 )
-from ...utils.command import run_sudo, write_file_sudo, read_file_sudo, backup_file
+from ...utils.command import (
+    run_sudo,
+    run_sudo_streaming,
+    write_file_sudo,
+    read_file_sudo,
+    backup_file,
+    check_command_exists,
+    as_root,
+)
 from ...utils.ui import (
     console,
     print_success,
@@ -28,6 +45,43 @@ from ...utils.ui import (
 from ...utils.validators import validate_domain, normalize_proxy_url
 from .templates import get_template, TEMPLATE_TYPES
 
+# Matched against raw config bytes, so no decode is needed to detect SSL
+_SSL_RE = re.compile(rb"listen\s+443|ssl_certificate")
+# Only the head of each config is probed; server/listen blocks sit at the top
+_SSL_PROBE_BYTES = 8192
+# Probe reads release the GIL, so a small pool overlaps them
+_SSL_PROBE_WORKERS = 8
+
+_EDITORS = ("vim", "vi", "nano", "micro")
+
+# Fingerprints of config trees that passed nginx -t, newest last
+_GOOD_CONFIGS_KEPT = 16
+
+# Directives naming files nginx -t opens: include pulls in more config,
+# the rest are certificates, keys and similar that must exist and parse
+_FILE_DIRECTIVE_RE = re.compile(
+    rb"(?:^|[\s;{}])(include|load_module|auth_basic_user_file|"
+    rb"(?:proxy_|grpc_|uwsgi_)?ssl_(?:certificate|certificate_key|trusted_certificate|"
+    rb"client_certificate|dhparam|crl|password_file|stapling_file))\s+([^;{}]+);",
+)
+_COMMENT_RE = re.compile(rb"#[^\n]*")
+
+
+def _probe_ssl(path: str) -> bool:
+    """Check whether a config file looks SSL-enabled.
+
+    Args:
+        path: Path to the nginx config file
+
+    Returns:
+        True if the head of the file mentions listen 443 or ssl_certificate
+    """
+    try:
+        with open(path, "rb") as f:
+            return _SSL_RE.search(f.read(_SSL_PROBE_BYTES)) is not None
+    except OSError:
+        return False
+
 
 @dataclass
 class DomainInfo:
@@ -44,6 +98,44 @@ class NginxManager:
     def __init__(self):
         self.sites_available = Path(NGINX_SITES_AVAILABLE)
         self.sites_enabled = Path(NGINX_SITES_ENABLED)
+        # String forms for the os-level calls in get_domains
+        self._sa_str = str(self.sites_available)
+        self._se_str = str(self.sites_enabled)
+        # Last scan, keyed by the site directory and config file mtimes
+        self._domains_cache: Optional[Tuple[Tuple[int, ...], List[DomainInfo]]] = None
+        # Set inside batch(): reloads are coalesced into one at the end
+        self._reload_deferred = False
+        self._reload_pending = False
+
+    def _domains_key(self, config_files: List[os.DirEntry]) -> Optional[Tuple[int, ...]]:
+        """Get the get_domains() cache key.
+
+        Adding, enabling, disabling or deleting a site changes a directory
+        mtime; editing a config in place (certbot adding SSL) only changes
+        that file's mtime, so both are part of the key.
+
+        Args:
+            config_files: Entries of the files in sites-available
+
+        Returns:
+            Directory and file mtimes in ns, or None if any can't be stat'ed
+        """
+        try:
+            return (
+                os.stat(self._sa_str).st_mtime_ns,
+                os.stat(self._se_str).st_mtime_ns,
+                *(e.stat(follow_symlinks=False).st_mtime_ns for e in config_files),
+            )
+        except OSError:
+            return None
+
+    def invalidate(self):
+        """Forget the cached domain list.
+
+        For changes made outside this manager, e.g. certbot rewriting a
+        site config, that may land within the mtime granularity.
+        """
+        self._domains_cache = None
 
     def get_domains(self) -> List[DomainInfo]:
         """Get all configured domains.
@@ -53,38 +145,51 @@ class NginxManager:
         """
         domains = []
 
-        if not self.sites_available.is_dir():
+        if not os.path.isdir(self._sa_str):
             print_error(f"Nginx sites-available directory not found: {self.sites_available}")
             return domains
 
-        # Get enabled domains (symlinks in sites-enabled)
-        enabled_names = set()
-        if self.sites_enabled.is_dir():
-            for item in self.sites_enabled.iterdir():
-                if item.is_symlink():
-                    target = item.resolve()
-                    if str(target).startswith(str(self.sites_available)):
-                        enabled_names.add(item.name)
-
         # Get all available domains
-        for config_file in sorted(self.sites_available.iterdir()):
-            if config_file.is_file():
-                # Check if SSL is configured (simple check for listen 443)
-                has_ssl = False
-                try:
-                    content = config_file.read_text()
-                    has_ssl = "listen 443" in content or "ssl_certificate" in content
-                except:
-                    pass
-
-                domains.append(DomainInfo(
-                    name=config_file.name,
-                    config_path=str(config_file),
-                    is_enabled=config_file.name in enabled_names,
-                    has_ssl=has_ssl,
-                ))
+        with os.scandir(self._sa_str) as entries:
+            config_files = sorted(
+                (e for e in entries if e.is_file(follow_symlinks=False)),
+                key=lambda e: e.name,
+            )
 
-        return domains
+        key = self._domains_key(config_files)
+        if key is not None and self._domains_cache and self._domains_cache[0] == key:
+            return list(self._domains_cache[1])
+
+        # Get enabled domains (symlinks in sites-enabled)
+        # A site is enabled if a link in sites-enabled points at its inode;
+        # relative, absolute and non-canonical link paths all compare equal
+        available_dev = os.stat(self._sa_str).st_dev
+        enabled_inodes = set()
+        if os.path.isdir(self._se_str):
+            with os.scandir(self._se_str) as entries:
+                for entry in entries:
+                    if entry.is_symlink():
+                        try:
+                            target = os.stat(entry.path)
+                        except OSError:
+                            continue  # dangling link
+                        if target.st_dev == available_dev:
+                            enabled_inodes.add(target.st_ino)
+
+        # Check if SSL is configured (simple check for listen 443)
+        with ThreadPoolExecutor(max_workers=_SSL_PROBE_WORKERS) as executor:
+            ssl_flags = list(executor.map(_probe_ssl, [e.path for e in config_files]))
+
+        for entry, has_ssl in zip(config_files, ssl_flags):
+            domains.append(DomainInfo(
+                name=entry.name,
+                config_path=entry.path,
+                is_enabled=entry.inode() in enabled_inodes,
+                has_ssl=has_ssl,
+            ))
+
+        self._domains_cache = (key, domains) if key is not None else None
+        return list(domains)
 
     def list_domains(self) -> List[DomainInfo]:
         """List all domains with their status.
@@ -196,6 +301,7 @@ class NginxManager:
             pause()
             return False
 
+        self.invalidate()
         print_success(f"Configuration created: {config_path}")
 
         # Test configuration
@@ -239,20 +345,22 @@ class NginxManager:
 
             domain_name = disabled[choice].name
 
-        source = self.sites_available / domain_name
-        dest = self.sites_enabled / domain_name
+        source = os.path.join(self._sa_str, domain_name)
+        dest = os.path.join(self._se_str, domain_name)
 
-        if dest.exists() or dest.is_symlink():
+        # One lstat covers both a live and a dangling link
+        if os.path.lexists(dest):
             print_warning(f"Domain '{domain_name}' is already enabled.")
             return False
 
-        success, _, _ = run_sudo(["ln", "-s", str(source), str(dest)])
+        success, _, _ = run_sudo(["ln", "-s", source, dest])
         if not success:
             print_error(f"Failed to enable domain '{domain_name}'.")
             return False
+        self.invalidate()
 
-        if not self.test_config():
-            run_sudo(["rm", str(dest)], show_command=False)
+        if not self.test_config(skip_if_known=True):
+            run_sudo(["rm", dest], show_command=False)
             print_error("Configuration test failed. Reverted changes.")
             return False
 
@@ -290,18 +398,19 @@ class NginxManager:
 
             domain_name = enabled[choice].name
 
-        symlink = self.sites_enabled / domain_name
+        symlink = os.path.join(self._se_str, domain_name)
 
-        if not symlink.is_symlink():
+        if not os.path.islink(symlink):
             print_warning(f"Domain '{domain_name}' is not enabled.")
             return False
 
-        success, _, _ = run_sudo(["rm", str(symlink)])
+        success, _, _ = run_sudo(["rm", symlink])
         if not success:
             print_error(f"Failed to disable domain '{domain_name}'.")
             return False
+        self.invalidate()
 
-        if not self.test_config():
+        if not self.test_config(skip_if_known=True):
             print_error("Configuration test failed after disabling.")
             return False
 
@@ -339,9 +448,9 @@ class NginxManager:
             return False
 
         # Remove symlink if enabled
-        symlink = self.sites_enabled / domain.name
-        if symlink.is_symlink():
-            run_sudo(["rm", str(symlink)], show_command=False)
+        symlink = os.path.join(self._se_str, domain.name)
+        if os.path.islink(symlink):
+            run_sudo(["rm", symlink], show_command=False)
 
         # Backup before deleting
         ensure_backup_dir("nginx")
@@ -351,6 +460,7 @@ class NginxManager:
 
         # Delete config file
         success, _, _ = run_sudo(["rm", domain.config_path])
+        self.invalidate()
         if not success:
             print_error(f"Failed to delete configuration.")
             pause()
@@ -427,13 +537,7 @@ class NginxManager:
         print_info(f"Backup created: {backup_path}")
 
         # Find available editor (vim first - most compatible with different terminals)
-        editors = ["vim", "vi", "nano", "micro"]
-        editor = None
-        for ed in editors:
-            from ...utils.command import check_command_exists
-            if check_command_exists(ed):
-                editor = ed
-                break
+        editor = next((ed for ed in _EDITORS if check_command_exists(ed)), None)
 
         if not editor:
             print_error("No text editor found. Please install vim, nano, or micro.")
@@ -456,10 +560,14 @@ class NginxManager:
         else:
             console.print("[dim]Save and exit the editor when done.[/dim]\n")
 
-        # Run editor with sudo -H (preserves TTY, sets HOME to root for editor configs)
-        import os
-        import shlex
-        os.system(f"sudo -H {editor} {shlex.quote(domain.config_path)}")
+        # Run editor with sudo -H (preserves TTY, sets HOME to root for editor configs).
+        # Spawned directly and waited on: no shell, no pipes to set up
+        argv = as_root([editor, domain.config_path])
+        if argv[0] == "sudo":
+            argv.insert(1, "-H")
+        os.spawnvp(os.P_WAIT, argv[0], argv)
+        # Edits change file content, not the directory, so drop the cache
+        self.invalidate()
 
         # Test config after editing
         if not self.test_config():
@@ -474,16 +582,106 @@ class NginxManager:
         pause()
         return True
 
-    def test_config(self) -> bool:
+    def _config_fingerprint(self) -> Optional[str]:
+        """Fingerprint every file nginx -t would read.
+
+        Walks the config from nginx.conf through its include directives,
+        hashing each config file's content, and records the stat of the
+        certificates, keys and other files the directives point to (or
+        that they are missing). The nginx binary is included so an upgrade
+        invalidates old results.
+
+        Returns:
+            Hex digest, or None if any part could not be read or resolved
+            (e.g. root-only key files, or paths built from variables)
+        """
+        conf_dir = os.path.dirname(NGINX_CONF)
+        digest = hashlib.sha256()
+        seen = set()
+        pending = [NGINX_CONF]
+
+        def _resolve(value: bytes) -> Optional[str]:
+            path = os.fsdecode(value.strip().strip(b"'\""))
+            if "$" in path:
+                return None
+            return os.path.join(conf_dir, path)
+
+        try:
+            nginx = shutil.which("nginx")
+            if nginx:
+                st = os.stat(nginx)
+                digest.update(f"{nginx}:{st.st_mtime_ns}:{st.st_size}\n".encode())
+
+            while pending:
+                path = pending.pop()
+                if path in seen:
+                    continue
+                seen.add(path)
+                with open(path, "rb") as f:
+                    content = f.read()
+                digest.update(path.encode() + b"\0" + hashlib.sha256(content).digest())
+
+                for name, value in _FILE_DIRECTIVE_RE.findall(_COMMENT_RE.sub(b"", content)):
+                    if value.strip().startswith((b"data:", b"engine:")):
+                        continue
+                    target = _resolve(value)
+                    if target is None:
+                        return None
+                    if name == b"include":
+                        matches = sorted(glob.glob(target)) if glob.has_magic(target) else [target]
+                        digest.update(f"include {target}:{len(matches)}\n".encode())
+                        pending.extend(reversed(matches))
+                        continue
+                    try:
+                        st = os.stat(target)
+                        stamp = f"{st.st_mtime_ns}:{st.st_size}"
+                    except FileNotFoundError:
+                        stamp = "missing"
+                    digest.update(f"{target}:{stamp}\n".encode())
+        except OSError:
+            return None
+
+        return digest.hexdigest()
+
+    def _load_good_configs(self) -> List[str]:
+        """Load fingerprints of config trees that passed nginx -t."""
+        try:
+            data = json.loads(NGINX_GOOD_CONFIGS_FILE.read_text())
+            return [fp for fp in data if isinstance(fp, str)]
+        except (OSError, ValueError, TypeError):
+            return []
+
+    def _remember_good_config(self, fingerprint: str):
+        """Record a config tree fingerprint that passed nginx -t."""
+        good = [fp for fp in self._load_good_configs() if fp != fingerprint]
+        good.append(fingerprint)
+        try:
+            NGINX_GOOD_CONFIGS_FILE.parent.mkdir(parents=True, exist_ok=True)
+            NGINX_GOOD_CONFIGS_FILE.write_text(json.dumps(good[-_GOOD_CONFIGS_KEPT:]))
+        except OSError:
+            pass
+
+    def test_config(self, skip_if_known: bool = False) -> bool:
         """Test nginx configuration syntax.
 
+        Args:
+            skip_if_known: Skip nginx -t if this exact config tree has
+                already passed it (e.g. re-enabling a site)
+
         Returns:
             True if config is valid, False otherwise
         """
+        fingerprint = self._config_fingerprint()
+        if skip_if_known and fingerprint and fingerprint in self._load_good_configs():
+            print_success("Configuration unchanged since its last successful test.")
+            return True
+
         console.print("\n[dim]Testing nginx configuration...[/dim]")
         success, stdout, stderr = run_sudo(["nginx", "-t"], show_command=False)
 
         if success:
+            if fingerprint:
+                self._remember_good_config(fingerprint)
             print_success("Configuration syntax OK.")
         else:
             print_error("Configuration test failed.")
@@ -492,12 +690,34 @@ class NginxManager:
 
         return success
 
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Coalesce nginx reloads across several domain operations.
+
+        Reloads requested inside the block are deferred, and nginx is
+        reloaded once on exit if any were requested.
+        """
+        self._reload_deferred = True
+        try:
+            yield
+        finally:
+            self._reload_deferred = False
+            if self._reload_pending:
+                self._reload_pending = False
+                self.reload()
+
     def reload(self) -> bool:
         """Reload nginx service.
 
+        Inside batch() the reload is only recorded and True is returned.
+
         Returns:
             True on success, False on failure
         """
+        if self._reload_deferred:
+            self._reload_pending = True
+            return True
+
         console.print("\n[dim]Reloading nginx...[/dim]")
         success, _, _ = run_sudo(["systemctl", "reload", "nginx"])
 
@@ -517,11 +737,10 @@ class NginxManager:
         clear_screen()
         print_header("Nginx Status")
 
-        success, stdout, stderr = run_sudo(
+        run_sudo_streaming(
             ["systemctl", "status", "nginx", "--no-pager"],
-            show_command=False
+            show_command=False,
         )
 
-        console.print(stdout or stderr)
         pause()
         return True
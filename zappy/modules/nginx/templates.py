@@ -12,53 +12,11 @@ TEMPLATE_TYPES = {
     "redirect": "HTTP redirect",
 }
 
+# Template bodies are str.format specs built once at import; literal
+# nginx braces are doubled.
 
-def get_template(
-    template_type: str,
-    server_name: str,
-    proxy_pass: Optional[str] = None,
-    root_path: Optional[str] = None,
-    redirect_url: Optional[str] = None,
-    php_socket: str = "/run/php/php-fpm.sock",
-) -> str:
-    """Generate an nginx configuration from a template.
-
-    Args:
-        template_type: Type of template (proxy, proxy-ws, static, php, redirect)
-        server_name: Domain name
-        proxy_pass: Backend URL for proxy templates
-        root_path: Root path for static/php templates
-        redirect_url: Target URL for redirect template
-        php_socket: PHP-FPM socket path
-
-    Returns:
-        Nginx configuration string
-    """
-    templates = {
-        "proxy": _template_proxy,
-        "proxy-ws": _template_proxy_websocket,
-        "static": _template_static,
-        "php": _template_php,
-        "redirect": _template_redirect,
-    }
-
-    generator = templates.get(template_type, _template_proxy)
-    return generator(
-        server_name=server_name,
-        proxy_pass=proxy_pass,
-        root_path=root_path,
-        redirect_url=redirect_url,
-        php_socket=php_socket,
-    )
-
-
-def _template_proxy(
-    server_name: str,
-    proxy_pass: Optional[str] = None,
-    **kwargs,
-) -> str:
-    """Standard reverse proxy template."""
-    return f"""server {{
+# Standard reverse proxy template
+_PROXY_TPL = """server {{
     listen 80;
     listen [::]:80;
     server_name {server_name};
@@ -76,19 +34,13 @@ def _template_proxy(
         proxy_read_timeout 60s;
     }}
 
-    error_log {NGINX_LOG_DIR}/{server_name}_error.log;
-    access_log {NGINX_LOG_DIR}/{server_name}_access.log;
+    error_log {log_dir}/{server_name}_error.log;
+    access_log {log_dir}/{server_name}_access.log;
 }}
 """
 
-
-def _template_proxy_websocket(
-    server_name: str,
-    proxy_pass: Optional[str] = None,
-    **kwargs,
-) -> str:
-    """Reverse proxy template with WebSocket support."""
-    return f"""server {{
+# Reverse proxy template with WebSocket support
+_PROXY_WS_TPL = """server {{
     listen 80;
     listen [::]:80;
     server_name {server_name};
@@ -111,20 +63,13 @@ def _template_proxy_websocket(
         proxy_read_timeout 86400s;
     }}
 
-    error_log {NGINX_LOG_DIR}/{server_name}_error.log;
-    access_log {NGINX_LOG_DIR}/{server_name}_access.log;
+    error_log {log_dir}/{server_name}_error.log;
+    access_log {log_dir}/{server_name}_access.log;
 }}
 """
 
-
-def _template_static(
-    server_name: str,
-    root_path: Optional[str] = None,
-    **kwargs,
-) -> str:
-    """Static file serving template."""
-    root = root_path or f"/var/www/{server_name}"
-    return f"""server {{
+# Static file serving template
+_STATIC_TPL = """server {{
     listen 80;
     listen [::]:80;
     server_name {server_name};
@@ -146,21 +91,13 @@ def _template_static(
     add_header X-Frame-Options "SAMEORIGIN" always;
     add_header X-Content-Type-Options "nosniff" always;
 
-    error_log {NGINX_LOG_DIR}/{server_name}_error.log;
-    access_log {NGINX_LOG_DIR}/{server_name}_access.log;
+    error_log {log_dir}/{server_name}_error.log;
+    access_log {log_dir}/{server_name}_access.log;
 }}
 """
 
-
-def _template_php(
-    server_name: str,
-    root_path: Optional[str] = None,
-    php_socket: str = "/run/php/php-fpm.sock",
-    **kwargs,
-) -> str:
-    """PHP application template with php-fpm."""
-    root = root_path or f"/var/www/{server_name}"
-    return f"""server {{
+# PHP application template with php-fpm
+_PHP_TPL = """server {{
     listen 80;
     listen [::]:80;
     server_name {server_name};
@@ -184,27 +121,60 @@ def _template_php(
         deny all;
     }}
 
-    error_log {NGINX_LOG_DIR}/{server_name}_error.log;
-    access_log {NGINX_LOG_DIR}/{server_name}_access.log;
+    error_log {log_dir}/{server_name}_error.log;
+    access_log {log_dir}/{server_name}_access.log;
 }}
 """
 
-
-def _template_redirect(
-    server_name: str,
-    redirect_url: Optional[str] = None,
-    **kwargs,
-) -> str:
-    """HTTP redirect template."""
-    target = redirect_url or f"https://{server_name}"
-    return f"""server {{
+# HTTP redirect template
+_REDIRECT_TPL = """server {{
     listen 80;
     listen [::]:80;
     server_name {server_name};
 
     return 301 {target}$request_uri;
 
-    error_log {NGINX_LOG_DIR}/{server_name}_error.log;
-    access_log {NGINX_LOG_DIR}/{server_name}_access.log;
+    error_log {log_dir}/{server_name}_error.log;
+    access_log {log_dir}/{server_name}_access.log;
 }}
 """
+
+_TEMPLATES: Dict[str, str] = {
+    "proxy": _PROXY_TPL,
+    "proxy-ws": _PROXY_WS_TPL,
+    "static": _STATIC_TPL,
+    "php": _PHP_TPL,
+    "redirect": _REDIRECT_TPL,
+}
+
+
+def get_template(
+    template_type: str,
+    server_name: str,
+    proxy_pass: Optional[str] = None,
+    root_path: Optional[str] = None,
+    redirect_url: Optional[str] = None,
+    php_socket: str = "/run/php/php-fpm.sock",
+) -> str:
+    """Generate an nginx configuration from a template.
+
+    Args:
+        template_type: Type of template (proxy, proxy-ws, static, php, redirect)
+        server_name: Domain name
+        proxy_pass: Backend URL for proxy templates
+        root_path: Root path for static/php templates
+        redirect_url: Target URL for redirect template
+        php_socket: PHP-FPM socket path
+
+    Returns:
+        Nginx configuration string
+    """
+    template = _TEMPLATES.get(template_type, _PROXY_TPL)
+    return template.format_map({
+        "server_name": server_name,
+        "proxy_pass": proxy_pass,
+        "root": root_path or f"/var/www/{server_name}",
+        "target": redirect_url or f"https://{server_name}",
+        "php_socket": php_socket,
+        "log_dir": NGINX_LOG_DIR,
+    })
@@ -1,9 +1,18 @@
 """Fail2ban installation and management."""
 
-from typing import Optional
+import re
+import sqlite3
+from typing import Dict, List, Optional, Set
 from pathlib import Path
 
-from ...utils.command import run_sudo, check_command_exists, write_file_sudo
+from ...utils.command import (
+    run_command,
+    run_sudo,
+    run_sudo_batch,
+    check_command_exists,
+    update_file_sudo,
+    read_file_sudo,
+)
 from ...utils.distro import get_package_manager, get_install_command, PackageManager
 from ...utils.ui import (
     console,
@@ -18,6 +27,48 @@ from ...utils.ui import (
     print_header,
 )
 
+FAIL2BAN_LOG = "/var/log/fail2ban.log"
+FAIL2BAN_DB = "/var/lib/fail2ban/fail2ban.sqlite3"
+
+# Logged by the server on every start, before jails restore their bans
+_SERVER_START = "Starting Fail2ban"
+
+# Matches action lines such as
+# "2024-01-01 12:00:00,000 fail2ban.actions [123]: NOTICE [sshd] Ban 1.2.3.4"
+_BAN_EVENT_RE = re.compile(r"\[([^\]]+)\]\s+(Restore Ban|Ban|Unban)\s+(\S+)")
+
+# Recommended jail.local written by _configure_default
+_JAIL_LOCAL = """# Zappy the VPS Toolbox - Fail2ban Configuration
+[DEFAULT]
+# Ban hosts for 1 hour
+bantime = 1h
+
+# Find time window (10 minutes)
+findtime = 10m
+
+# Max retries before ban
+maxretry = 5
+
+# Ignore local IPs
+ignoreip = 127.0.0.1/8 ::1
+
+[sshd]
+enabled = true
+port = ssh
+filter = sshd
+logpath = /var/log/auth.log
+maxretry = 3
+bantime = 1h
+
+# For RHEL/CentOS style logs
+[sshd-systemd]
+enabled = true
+backend = systemd
+filter = sshd
+maxretry = 3
+bantime = 1h
+"""
+
 
 class Fail2banManager:
     """Manages fail2ban installation and configuration."""
@@ -25,6 +76,9 @@ class Fail2banManager:
     def __init__(self):
         self.config_dir = Path("/etc/fail2ban")
         self.jail_local = self.config_dir / "jail.local"
+        self._jail_local_str = str(self.jail_local)
+        # Cached is_installed() result; reset by install()
+        self._installed: Optional[bool] = None
 
     def is_installed(self) -> bool:
         """Check if fail2ban is installed.
@@ -32,7 +86,9 @@ class Fail2banManager:
         Returns:
             True if installed, False otherwise
         """
-        return check_command_exists("fail2ban-client")
+        if self._installed is None:
+            self._installed = check_command_exists("fail2ban-client")
+        return self._installed
 
     def is_running(self) -> bool:
         """Check if fail2ban is running.
@@ -40,11 +96,11 @@ class Fail2banManager:
         Returns:
             True if running, False otherwise
         """
-        success, _, _ = run_sudo(
-            ["systemctl", "is-active", "fail2ban"],
-            show_command=False
+        # is-active needs no root, so skip the sudo round-trip
+        returncode, _, _ = run_command(
+            ["systemctl", "is-active", "--quiet", "fail2ban"]
         )
-        return success
+        return returncode == 0
 
     def install(self) -> bool:
         """Install fail2ban.
@@ -81,6 +137,7 @@ class Fail2banManager:
             pause()
             return False
 
+        self._installed = None
         print_success("Fail2ban installed.")
 
         # Configure and enable
@@ -89,8 +146,7 @@ class Fail2banManager:
 
         # Enable and start
         console.print("\n[dim]Enabling fail2ban service...[/dim]")
-        run_sudo(["systemctl", "enable", "fail2ban"])
-        run_sudo(["systemctl", "start", "fail2ban"])
+        run_sudo(["systemctl", "enable", "--now", "--no-block", "fail2ban"])
 
         print_success("Fail2ban is now active.")
         pause()
@@ -104,38 +160,7 @@ class Fail2banManager:
         """
         console.print("\n[dim]Applying default configuration...[/dim]")
 
-        config = """# Zappy the VPS Toolbox - Fail2ban Configuration
-[DEFAULT]
-# Ban hosts for 1 hour
-bantime = 1h
-
-# Find time window (10 minutes)
-findtime = 10m
-
-# Max retries before ban
-maxretry = 5
-
-# Ignore local IPs
-ignoreip = 127.0.0.1/8 ::1
-
-[sshd]
-enabled = true
-port = ssh
-filter = sshd
-logpath = /var/log/auth.log
-maxretry = 3
-bantime = 1h
-
-# For RHEL/CentOS style logs
-[sshd-systemd]
-enabled = true
-backend = systemd
-filter = sshd
-maxretry = 3
-bantime = 1h
-"""
-
-        if write_file_sudo(str(self.jail_local), config):
+        if update_file_sudo(self._jail_local_str, _JAIL_LOCAL):
             print_success("Configuration applied.")
             return True
 
@@ -173,6 +198,66 @@ bantime = 1h
         pause()
         return True
 
+    def _banned_from_log(self) -> Optional[Dict[str, Set[str]]]:
+        """Replay ban/unban events from the fail2ban log.
+
+        Only events after the last server start are replayed; bans that
+        outlive a restart are logged again as "Restore Ban" then. If the
+        current log has no start line it has been rotated since, and the
+        replay can't be trusted.
+
+        Returns:
+            Dict of jail name to currently banned IPs, or None if the log
+            cannot be read or was rotated since fail2ban started
+        """
+        content = read_file_sudo(FAIL2BAN_LOG)
+        if content is None:
+            return None
+
+        start = content.rfind(_SERVER_START)
+        if start == -1:
+            return None
+
+        banned: Dict[str, Set[str]] = {}
+        for match in _BAN_EVENT_RE.finditer(content, start):
+            jail, action, ip = match.groups()
+            ips = banned.setdefault(jail, set())
+            if action == "Unban":
+                ips.discard(ip)
+            else:
+                ips.add(ip)
+        return banned
+
+    def _jails_banning(self, ip: str) -> Optional[List[str]]:
+        """Look up which jails currently ban an IP in fail2ban's database.
+
+        Expired bans stay in the table until dbpurgeage, so only rows whose
+        ban hasn't run out yet (or is permanent) count.
+
+        Args:
+            ip: IP address to look up
+
+        Returns:
+            List of jail names, or None if the database can't be read
+            (it is usually root-only, and pre-0.11 schemas lack bantime)
+        """
+        try:
+            con = sqlite3.connect(f"file:{FAIL2BAN_DB}?mode=ro", uri=True)
+        except sqlite3.Error:
+            return None
+
+        try:
+            rows = con.execute(
+                "SELECT DISTINCT jail FROM bips WHERE ip = ? AND "
+                "(bantime < 0 OR timeofban + bantime > CAST(strftime('%s', 'now') AS INTEGER))",
+                (ip,),
+            ).fetchall()
+        except sqlite3.Error:
+            return None
+        finally:
+            con.close()
+        return [row[0] for row in rows]
+
     def show_banned(self) -> bool:
         """Show currently banned IPs.
 
@@ -198,18 +283,30 @@ bantime = 1h
             pause()
             return False
 
-        # Extract jail names
+        # Extract jail names from the single "Jail list:" line
         jails = []
-        for line in stdout.split("\n"):
-            if "Jail list:" in line:
-                jail_str = line.split(":", 1)[1].strip()
-                jails = [j.strip() for j in jail_str.split(",") if j.strip()]
+        _, sep, rest = stdout.partition("Jail list:")
+        if sep:
+            jail_str, _, _ = rest.partition("\n")
+            jails = [j.strip() for j in jail_str.split(",") if j.strip()]
 
         if not jails:
             print_info("No active jails.")
             pause()
             return True
 
+        # One read of the log replaces a status call per jail
+        banned = self._banned_from_log()
+        if banned is not None:
+            console.print(f"[dim]Replayed from {FAIL2BAN_LOG} since fail2ban started[/dim]")
+            for jail in jails:
+                ips = banned.get(jail, set())
+                console.print(f"\n[bold cyan]{jail}:[/bold cyan]")
+                console.print(f"  Currently banned: {len(ips)}")
+                console.print(f"  Banned IP list: {' '.join(sorted(ips))}")
+            pause()
+            return True
+
         # Show banned IPs for each jail
         for jail in jails:
             console.print(f"\n[bold cyan]{jail}:[/bold cyan]")
@@ -218,9 +315,13 @@ bantime = 1h
                 show_command=False
             )
 
-            for line in stdout.split("\n"):
-                if "Banned IP" in line or "Currently banned" in line:
+            # "Currently banned" precedes "Banned IP list", which is last
+            for line in stdout.splitlines():
+                if "Currently banned" in line:
+                    console.print(f"  {line.strip()}")
+                elif "Banned IP" in line:
                     console.print(f"  {line.strip()}")
+                    break
 
         pause()
         return True
@@ -245,11 +346,24 @@ bantime = 1h
             pause()
             return False
 
-        # Try to unban from all jails
-        success, stdout, _ = run_sudo(
-            ["fail2ban-client", "unban", ip],
-            show_command=True
-        )
+        jails = self._jails_banning(ip)
+        if jails == []:
+            print_info(f"IP {ip} is not banned in any jail.")
+            pause()
+            return True
+
+        if jails:
+            # Unban only from the jails that hold the IP; fails if any jail did
+            success, _, _ = run_sudo_batch(
+                [["fail2ban-client", "set", jail, "unbanip", ip] for jail in jails],
+                stop_on_error=False,
+            )
+        else:
+            # Try to unban from all jails
+            success, stdout, _ = run_sudo(
+                ["fail2ban-client", "unban", ip],
+                show_command=True
+            )
 
         if success:
             print_success(f"IP {ip} unbanned.")
@@ -1,11 +1,20 @@
 """SSH configuration and hardening."""
 
+import os
 import re
+import stat
+import tempfile
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 
 from ...config import SSH_CONFIG_PATH, get_backup_path, ensure_backup_dir
-from ...utils.command import run_sudo, read_file_sudo, write_file_sudo, backup_file
+from ...utils.command import (
+    run_sudo,
+    read_file_sudo,
+    write_file_sudo,
+    backup_file,
+    wait_for_service,
+)
 from ...utils.ui import (
     console,
     print_success,
@@ -19,6 +28,7 @@ from ...utils.ui import (
     clear_screen,
     print_header,
     display_status,
+    StatusRow,
 )
 from ...utils.validators import validate_port
 
@@ -26,29 +36,135 @@ from ...utils.validators import validate_port
 class SSHManager:
     """Manages SSH server configuration."""
 
+    # Any directive line, commented or not; group 1 is the directive name.
+    # Only blanks, not \s, so a one-word line can't run on into the next
+    _DIRECTIVE_RE = re.compile(r"^#?[ \t]*([A-Za-z]+)[ \t]+.*$", re.MULTILINE)
+
+    # Settings applied by harden_all
+    _HARDENING_SETTINGS = {
+        "PermitRootLogin": "prohibit-password",
+        "PubkeyAuthentication": "yes",
+        "MaxAuthTries": "3",
+        "ClientAliveInterval": "300",
+        "ClientAliveCountMax": "2",
+    }
+
     def __init__(self):
         self.config_path = SSH_CONFIG_PATH
+        self._config_path_str = str(self.config_path)
+        # Parsed settings keyed by the config file's (mtime_ns, size)
+        self._settings_cache: Optional[Tuple[Tuple[int, int], Dict[str, str]]] = None
+
+    def _config_stat_key(self) -> Optional[Tuple[int, int]]:
+        """Get the (mtime_ns, size) of the SSH config, if it can be stat'ed."""
+        try:
+            st = os.stat(self.config_path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
 
     def get_current_settings(self) -> Dict[str, str]:
         """Get current SSH configuration settings.
 
+        The parsed result is reused until the file's mtime or size changes.
+
         Returns:
             Dictionary of setting name to value
         """
-        content = read_file_sudo(str(self.config_path))
+        key = self._config_stat_key()
+        if key is not None and self._settings_cache and self._settings_cache[0] == key:
+            return self._settings_cache[1]
+
+        content = read_file_sudo(self._config_path_str)
         if not content:
             return {}
 
         settings = {}
-        for line in content.split("\n"):
+        for line in content.splitlines():
             line = line.strip()
-            if line and not line.startswith("#"):
-                parts = line.split(None, 1)
-                if len(parts) == 2:
-                    settings[parts[0]] = parts[1]
-
+            if not line or line[0] == "#":
+                continue
+            name, _, value = line.partition(" ")
+            if "\t" in name:
+                # Tab-separated directive
+                name, _, value = line.partition("\t")
+            value = value.strip()
+            if value:
+                settings[name] = value
+
+        if key is not None:
+            self._settings_cache = (key, settings)
         return settings
 
+    def _apply_settings(self, content: str, settings: Dict[str, str]) -> str:
+        """Set directives in config content in a single pass.
+
+        Existing lines (commented or not) are replaced; directives not
+        present are appended at the end.
+
+        Args:
+            content: Current configuration content
+            settings: Directive name to value
+
+        Returns:
+            Updated configuration content
+        """
+        seen = set()
+
+        def _replace(match: re.Match) -> str:
+            name = match.group(1)
+            if name not in settings:
+                return match.group(0)
+            seen.add(name)
+            return f"{name} {settings[name]}"
+
+        new_content = self._DIRECTIVE_RE.sub(_replace, content)
+
+        missing = [f"{name} {value}" for name, value in settings.items() if name not in seen]
+        if missing:
+            new_content = new_content.rstrip() + "\n" + "\n".join(missing) + "\n"
+        return new_content
+
+    def _test_config(self, content: str) -> Tuple[bool, str]:
+        """Validate config content with sshd -t before it is installed.
+
+        Args:
+            content: Candidate sshd_config content
+
+        Returns:
+            Tuple of (valid, stderr)
+        """
+        with tempfile.NamedTemporaryFile("w", suffix=".conf", delete=False) as f:
+            f.write(content)
+            candidate = f.name
+
+        try:
+            success, _, stderr = run_sudo(
+                ["sshd", "-t", "-f", candidate],
+                show_command=False
+            )
+        finally:
+            os.unlink(candidate)
+        return success, stderr
+
+    def _restart_sshd(self) -> bool:
+        """Restart sshd without blocking on the systemd job.
+
+        Returns:
+            True if sshd is active again, False otherwise
+        """
+        success, _, _ = run_sudo(["systemctl", "restart", "--no-block", "sshd"])
+        if not success:
+            print_error("Failed to restart SSH service.")
+            return False
+
+        if not wait_for_service("sshd"):
+            print_warning("SSH service is not active yet. Check: systemctl status sshd")
+            return False
+
+        print_success("SSH service restarted.")
+        return True
+
     def show_status(self) -> bool:
         """Show current SSH configuration status.
 
@@ -67,10 +183,10 @@ class SSHManager:
         pubkey_auth = settings.get("PubkeyAuthentication", "yes")
 
         items = [
-            ("SSH Port", port, port != "22"),
-            ("Root Login", permit_root, permit_root in ("no", "prohibit-password")),
-            ("Password Auth", password_auth, password_auth == "no"),
-            ("Public Key Auth", pubkey_auth, pubkey_auth == "yes"),
+            StatusRow("SSH Port", port, port != "22"),
+            StatusRow("Root Login", permit_root, permit_root in ("no", "prohibit-password")),
+            StatusRow("Password Auth", password_auth, password_auth == "no"),
+            StatusRow("Public Key Auth", pubkey_auth, pubkey_auth == "yes"),
         ]
 
         display_status(items)
@@ -98,33 +214,25 @@ class SSHManager:
         Returns:
             True on success, False on failure
         """
-        content = read_file_sudo(str(self.config_path))
+        content = read_file_sudo(self._config_path_str)
         if not content:
             print_error("Failed to read SSH configuration.")
             return False
 
         # Create backup
         ensure_backup_dir("ssh")
-        backup_path = get_backup_path("ssh", "sshd_config")
-        if not backup_file(str(self.config_path), str(backup_path)):
+        backup_path = str(get_backup_path("ssh", "sshd_config"))
+        if not backup_file(self._config_path_str, backup_path):
             print_error("Failed to create backup.")
             return False
         print_info(f"Backup created: {backup_path}")
 
-        # Pattern to match the setting (commented or not)
-        pattern = rf"^#?\s*{setting}\s+.*$"
-        new_line = f"{setting} {value}"
-
-        if re.search(pattern, content, re.MULTILINE):
-            # Replace existing line
-            new_content = re.sub(pattern, new_line, content, flags=re.MULTILINE)
-        else:
-            # Add new line at end
-            new_content = content.rstrip() + f"\n{new_line}\n"
+        new_content = self._apply_settings(content, {setting: value})
 
-        if not write_file_sudo(str(self.config_path), new_content):
+        if not write_file_sudo(self._config_path_str, new_content):
             print_error("Failed to write configuration.")
             return False
+        self._settings_cache = None
 
         # Test configuration
         console.print("\n[dim]Testing SSH configuration...[/dim]")
@@ -134,7 +242,7 @@ class SSHManager:
             print_error("Configuration test failed!")
             console.print(f"[red]{stderr}[/red]")
             if confirm("Restore backup?", default=True):
-                backup_file(str(backup_path), str(self.config_path))
+                backup_file(backup_path, self._config_path_str)
                 print_success("Backup restored.")
             return False
 
@@ -179,12 +287,8 @@ class SSHManager:
             print_success(f"SSH port changed to {new_port}")
 
             if confirm("Restart SSH service now?"):
-                success, _, _ = run_sudo(["systemctl", "restart", "sshd"])
-                if success:
-                    print_success("SSH service restarted.")
+                if self._restart_sshd():
                     print_warning(f"Connect with: ssh -p {new_port} user@host")
-                else:
-                    print_error("Failed to restart SSH service.")
 
         pause()
         return True
@@ -223,9 +327,7 @@ class SSHManager:
             print_success(f"Root login set to: {value}")
 
             if confirm("Restart SSH service now?"):
-                success, _, _ = run_sudo(["systemctl", "restart", "sshd"])
-                if success:
-                    print_success("SSH service restarted.")
+                self._restart_sshd()
 
         pause()
         return True
@@ -268,9 +370,7 @@ class SSHManager:
             print_success(f"Password authentication set to: {value}")
 
             if confirm("Restart SSH service now?"):
-                success, _, _ = run_sudo(["systemctl", "restart", "sshd"])
-                if success:
-                    print_success("SSH service restarted.")
+                self._restart_sshd()
 
         pause()
         return True
@@ -298,62 +398,49 @@ class SSHManager:
         if not confirm("\nProceed with hardening?"):
             return False
 
-        # Backup first
-        ensure_backup_dir("ssh")
-        backup_path = get_backup_path("ssh", "sshd_config")
-        if not backup_file(str(self.config_path), str(backup_path)):
-            print_error("Failed to create backup.")
-            pause()
-            return False
-        print_success(f"Backup created: {backup_path}")
-
-        content = read_file_sudo(str(self.config_path))
+        content = read_file_sudo(self._config_path_str)
         if not content:
             print_error("Failed to read configuration.")
             pause()
             return False
 
-        # Settings to apply
-        hardening_settings = {
-            "PermitRootLogin": "prohibit-password",
-            "PubkeyAuthentication": "yes",
-            "MaxAuthTries": "3",
-            "ClientAliveInterval": "300",
-            "ClientAliveCountMax": "2",
-        }
-
-        new_content = content
-        for setting, value in hardening_settings.items():
-            pattern = rf"^#?\s*{setting}\s+.*$"
-            new_line = f"{setting} {value}"
-
-            if re.search(pattern, new_content, re.MULTILINE):
-                new_content = re.sub(pattern, new_line, new_content, flags=re.MULTILINE)
-            else:
-                new_content = new_content.rstrip() + f"\n{new_line}\n"
-
-        if not write_file_sudo(str(self.config_path), new_content):
-            print_error("Failed to write configuration.")
+        # Backup from the content already read instead of a second cp
+        ensure_backup_dir("ssh")
+        backup_path = str(get_backup_path("ssh", "sshd_config"))
+        # Keep the original's mode (0600 on RHEL); default to private
+        try:
+            mode = f"{stat.S_IMODE(os.stat(self._config_path_str).st_mode):o}"
+        except OSError:
+            mode = "600"
+        if not write_file_sudo(backup_path, content, mode=mode):
+            print_error("Failed to create backup.")
             pause()
             return False
+        print_success(f"Backup created: {backup_path}")
 
-        # Test configuration
-        success, _, stderr = run_sudo(["sshd", "-t"], show_command=False)
+        new_content = self._apply_settings(content, self._HARDENING_SETTINGS)
+
+        # Test before writing so a bad config never reaches sshd_config
+        success, stderr = self._test_config(new_content)
         if not success:
             print_error("Configuration test failed!")
-            backup_file(str(backup_path), str(self.config_path))
-            print_success("Backup restored.")
+            console.print(f"[red]{stderr}[/red]")
+            print_info("No changes were written.")
+            pause()
+            return False
+
+        if not write_file_sudo(self._config_path_str, new_content):
+            print_error("Failed to write configuration.")
             pause()
             return False
+        self._settings_cache = None
 
         print_success("SSH hardening applied:")
-        for setting, value in hardening_settings.items():
+        for setting, value in self._HARDENING_SETTINGS.items():
             console.print(f"  • {setting} = {value}")
 
         if confirm("\nRestart SSH service now?"):
-            success, _, _ = run_sudo(["systemctl", "restart", "sshd"])
-            if success:
-                print_success("SSH service restarted.")
+            self._restart_sshd()
 
         pause()
         return True
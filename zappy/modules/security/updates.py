@@ -1,6 +1,6 @@
 """Automatic security updates configuration."""
 
-from ...utils.command import run_sudo, check_command_exists, write_file_sudo
+from ...utils.command import run_sudo, check_command_exists, update_file_sudo
 from ...utils.distro import detect_distro, get_install_command, PackageManager
 from ...utils.ui import (
     console,
@@ -14,6 +14,48 @@ from ...utils.ui import (
     print_header,
 )
 
+# Config files written by AutoUpdatesManager
+_UNATTENDED_UPGRADES_CONF = """// Zappy the VPS Toolbox - Unattended Upgrades Configuration
+Unattended-Upgrade::Allowed-Origins {
+    "${distro_id}:${distro_codename}";
+    "${distro_id}:${distro_codename}-security";
+    "${distro_id}ESMApps:${distro_codename}-apps-security";
+    "${distro_id}ESM:${distro_codename}-infra-security";
+};
+
+// Remove unused automatically installed kernel-related packages
+Unattended-Upgrade::Remove-Unused-Kernel-Packages "true";
+
+// Remove unused dependencies
+Unattended-Upgrade::Remove-Unused-Dependencies "true";
+
+// Automatically reboot if required
+Unattended-Upgrade::Automatic-Reboot "false";
+
+// If automatic reboot is enabled, reboot at this time
+Unattended-Upgrade::Automatic-Reboot-Time "02:00";
+"""
+
+_AUTO_UPGRADES_CONF = """APT::Periodic::Update-Package-Lists "1";
+APT::Periodic::Unattended-Upgrade "1";
+APT::Periodic::AutocleanInterval "7";
+"""
+
+_DNF_AUTOMATIC_CONF = """# Zappy the VPS Toolbox - DNF Automatic Configuration
+[commands]
+upgrade_type = security
+random_sleep = 0
+download_updates = yes
+apply_updates = yes
+
+[emitters]
+emit_via = stdio
+
+[command]
+upgrade_cmd = dnf
+command_args = -y
+"""
+
 
 class AutoUpdatesManager:
     """Manages automatic security updates."""
@@ -68,44 +110,17 @@ class AutoUpdatesManager:
         print_success("Package installed.")
 
         # Configure
-        config = """// Zappy the VPS Toolbox - Unattended Upgrades Configuration
-Unattended-Upgrade::Allowed-Origins {
-    "${distro_id}:${distro_codename}";
-    "${distro_id}:${distro_codename}-security";
-    "${distro_id}ESMApps:${distro_codename}-apps-security";
-    "${distro_id}ESM:${distro_codename}-infra-security";
-};
-
-// Remove unused automatically installed kernel-related packages
-Unattended-Upgrade::Remove-Unused-Kernel-Packages "true";
-
-// Remove unused dependencies
-Unattended-Upgrade::Remove-Unused-Dependencies "true";
-
-// Automatically reboot if required
-Unattended-Upgrade::Automatic-Reboot "false";
-
-// If automatic reboot is enabled, reboot at this time
-Unattended-Upgrade::Automatic-Reboot-Time "02:00";
-"""
-
         config_path = "/etc/apt/apt.conf.d/50unattended-upgrades"
         console.print("\n[dim]Configuring unattended-upgrades...[/dim]")
 
-        if not write_file_sudo(config_path, config):
+        if not update_file_sudo(config_path, _UNATTENDED_UPGRADES_CONF):
             print_warning("Using default configuration.")
 
         # Enable auto-updates
-        auto_config = """APT::Periodic::Update-Package-Lists "1";
-APT::Periodic::Unattended-Upgrade "1";
-APT::Periodic::AutocleanInterval "7";
-"""
-
-        write_file_sudo("/etc/apt/apt.conf.d/20auto-upgrades", auto_config)
+        update_file_sudo("/etc/apt/apt.conf.d/20auto-upgrades", _AUTO_UPGRADES_CONF)
 
         # Enable service
-        run_sudo(["systemctl", "enable", "unattended-upgrades"])
-        run_sudo(["systemctl", "start", "unattended-upgrades"])
+        run_sudo(["systemctl", "enable", "--now", "--no-block", "unattended-upgrades"])
 
         print_success("Automatic security updates enabled.")
         print_info("Security updates will be installed automatically.")
@@ -133,30 +148,14 @@ APT::Periodic::AutocleanInterval "7";
         print_success("Package installed.")
 
         # Configure
-        config = """# Zappy the VPS Toolbox - DNF Automatic Configuration
-[commands]
-upgrade_type = security
-random_sleep = 0
-download_updates = yes
-apply_updates = yes
-
-[emitters]
-emit_via = stdio
-
-[command]
-upgrade_cmd = dnf
-command_args = -y
-"""
-
         config_path = "/etc/dnf/automatic.conf"
         console.print("\n[dim]Configuring dnf-automatic...[/dim]")
 
-        if not write_file_sudo(config_path, config):
+        if not update_file_sudo(config_path, _DNF_AUTOMATIC_CONF):
             print_warning("Using default configuration.")
 
         # Enable timer
-        run_sudo(["systemctl", "enable", "dnf-automatic.timer"])
-        run_sudo(["systemctl", "start", "dnf-automatic.timer"])
+        run_sudo(["systemctl", "enable", "--now", "--no-block", "dnf-automatic.timer"])
 
         print_success("Automatic security updates enabled.")
         print_info("Security updates will be checked daily.")
@@ -1,9 +1,15 @@
 """AiTermy AI terminal assistant installation."""
 
+import os
+import re
+import stat
+import subprocess
+from functools import cached_property
 from pathlib import Path
+from typing import Optional, Tuple
 
 from ...config import AITERMY_DIR
-from ...utils.command import run_sudo, run_command, check_command_exists
+from ...utils.command import run_sudo, run_sudo_batch, run_command, check_command_exists
 from ...utils.ui import (
     console,
     print_success,
@@ -22,8 +28,29 @@ class AiTermyInstaller:
 
     REPO_URL = "https://github.com/KristjanPikhof/AiTermy.git"
 
+    # Shell integration marker: "aitermy" in any case, or the ai() function
+    _CONFIG_RE = re.compile(rb"(?i:aitermy)|ai\(\)")
+    _CONFIG_CHUNK = 8192
+    # Bytes carried between chunks so a marker split across them still matches
+    _CONFIG_OVERLAP = len(b"aitermy") - 1
+
     def __init__(self):
         self.install_dir = AITERMY_DIR
+        self._rc_files = (Path.home() / ".zshrc", Path.home() / ".bashrc")
+        # Last is_configured() answer, keyed by the rc files' (mtime_ns, size)
+        self._configured_cache: Optional[Tuple[tuple, bool]] = None
+        # Reset by install/uninstall, which are the only things changing it
+        self._installed_cache: Optional[bool] = None
+
+    @cached_property
+    def _install_dir_str(self) -> str:
+        """Install directory as a string, for command arguments."""
+        return str(self.install_dir)
+
+    @cached_property
+    def _install_script_str(self) -> str:
+        """Path of the AiTermy installer script."""
+        return os.path.join(self._install_dir_str, "install.sh")
 
     def is_installed(self) -> bool:
         """Check if AiTermy is installed.
@@ -31,7 +58,13 @@ class AiTermyInstaller:
         Returns:
             True if installed, False otherwise
         """
-        return (self.install_dir / "install.sh").exists()
+        if self._installed_cache is None:
+            try:
+                st = os.stat(self._install_script_str)
+                self._installed_cache = stat.S_ISREG(st.st_mode)
+            except OSError:
+                self._installed_cache = False
+        return self._installed_cache
 
     def is_configured(self) -> bool:
         """Check if AiTermy is configured in shell.
@@ -39,17 +72,42 @@ class AiTermyInstaller:
         Returns:
             True if configured, False otherwise
         """
-        # Check if 'ai' function exists in zshrc or bashrc
-        zshrc = Path.home() / ".zshrc"
-        bashrc = Path.home() / ".bashrc"
-
-        for rc_file in [zshrc, bashrc]:
-            if rc_file.exists():
-                content = rc_file.read_text()
-                if "aitermy" in content.lower() or "ai()" in content:
-                    return True
+        signature = []
+        for rc_file in self._rc_files:
+            try:
+                st = os.stat(rc_file)
+                signature.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                signature.append(None)
+        signature = tuple(signature)
+
+        if self._configured_cache and self._configured_cache[0] == signature:
+            return self._configured_cache[1]
 
-        return False
+        # Check if 'ai' function exists in zshrc or bashrc
+        configured = False
+        for rc_file, sig in zip(self._rc_files, signature):
+            if sig is None:
+                continue
+            # Chunk by chunk on raw bytes: no decode, no lowered copy, and a
+            # match near the top stops the read early
+            try:
+                with open(rc_file, "rb") as f:
+                    carry = b""
+                    while not configured:
+                        chunk = f.read(self._CONFIG_CHUNK)
+                        if not chunk:
+                            break
+                        window = carry + chunk
+                        configured = self._CONFIG_RE.search(window) is not None
+                        carry = window[-self._CONFIG_OVERLAP:]
+            except OSError:
+                continue
+            if configured:
+                break
+
+        self._configured_cache = (signature, configured)
+        return configured
 
     def install(self) -> bool:
         """Install AiTermy.
@@ -92,9 +150,12 @@ class AiTermyInstaller:
         # Create install directory
         run_sudo(["mkdir", "-p", str(self.install_dir.parent)])
 
+        # Only the tip of the default branch is ever used
         success, _, stderr = run_sudo([
-            "git", "clone", self.REPO_URL, str(self.install_dir)
+            "git", "clone", "--depth=1", "--single-branch",
+            self.REPO_URL, self._install_dir_str
         ])
+        self._installed_cache = None
 
         if not success:
             print_error("Failed to clone AiTermy repository.")
@@ -124,15 +185,16 @@ class AiTermyInstaller:
             return False
 
         # Make installer executable
-        run_sudo(["chmod", "+x", str(self.install_dir / "install.sh")])
+        run_sudo(["chmod", "+x", self._install_script_str])
 
-        # Run installer (interactive)
-        import subprocess
+        # Run installer (interactive, so it keeps the terminal: no capture)
         result = subprocess.run(
-            ["bash", str(self.install_dir / "install.sh")],
-            cwd=str(self.install_dir)
+            ["bash", self._install_script_str],
+            cwd=self._install_dir_str
         )
 
+        self._installed_cache = None
+        self._configured_cache = None
         if result.returncode == 0:
             print_success("AiTermy installed!")
             console.print()
@@ -163,9 +225,12 @@ class AiTermyInstaller:
 
         console.print("[dim]Updating AiTermy...[/dim]")
 
-        # Use sudo since repo was cloned with sudo
-        success, _, stderr = run_sudo([
-            "git", "-C", str(self.install_dir), "pull"
+        # Use sudo since repo was cloned with sudo. A shallow fetch plus a
+        # hard reset skips pull's merge step; the clone has no local work
+        repo = self._install_dir_str
+        success, _, stderr = run_sudo_batch([
+            ["git", "-C", repo, "fetch", "--depth=1", "origin"],
+            ["git", "-C", repo, "reset", "--hard", "origin/HEAD"],
         ], show_command=False)
 
         if success:
@@ -201,7 +266,7 @@ class AiTermyInstaller:
 
             # Show version/last commit
             success, stdout, _ = run_command([
-                "git", "-C", str(self.install_dir), "log", "-1", "--format=%h %s"
+                "git", "-C", self._install_dir_str, "log", "-1", "--format=%h %s"
             ])
             if success:
                 console.print(f"Latest commit: {stdout.strip()}")
@@ -229,7 +294,8 @@ class AiTermyInstaller:
         if not confirm("Proceed with uninstall?"):
             return False
 
-        success, _, _ = run_sudo(["rm", "-rf", str(self.install_dir)])
+        success, _, _ = run_sudo(["rm", "-rf", self._install_dir_str])
+        self._installed_cache = None
 
         if success:
             print_success("AiTermy uninstalled.")
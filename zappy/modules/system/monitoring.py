@@ -1,6 +1,18 @@
 """System monitoring utilities."""
 
-from ...utils.command import run_sudo, run_command
+import os
+import shutil
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from ...utils.command import (
+    run_sudo,
+    run_sudo_batch,
+    run_sudo_lines,
+    run_sudo_streaming,
+    run_command,
+)
 from ...utils.ui import (
     console,
     print_success,
@@ -11,12 +23,164 @@ from ...utils.ui import (
     pause,
     clear_screen,
     print_header,
+    display_table,
 )
 
+# Gap between the two /proc/stat samples used for CPU usage
+_CPU_SAMPLE_INTERVAL = 0.05
+
+# Log tails read in-process look at most this far back from the end
+_TAIL_BYTES = 64 * 1024
+# Separates per-file output when unreadable logs are tailed in one sudo call
+_TAIL_SEPARATOR = "--- zappy tail ---"
+
+
+def _read_proc_stat() -> Optional[Tuple[int, int]]:
+    """Read aggregate CPU time from /proc/stat.
+
+    Returns:
+        Tuple of (idle jiffies, total jiffies), or None if unavailable
+    """
+    try:
+        with open("/proc/stat") as f:
+            fields = [int(v) for v in f.readline().split()[1:]]
+    except (OSError, ValueError):
+        return None
+    # idle + iowait count as idle time
+    idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+    return idle, sum(fields)
+
+
+def _cpu_percent() -> Optional[float]:
+    """Sample /proc/stat twice and compute overall CPU usage.
+
+    Returns:
+        CPU usage in percent, or None if /proc/stat can't be read
+    """
+    first = _read_proc_stat()
+    time.sleep(_CPU_SAMPLE_INTERVAL)
+    second = _read_proc_stat()
+    if first is None or second is None:
+        return None
+
+    idle_delta = second[0] - first[0]
+    total_delta = second[1] - first[1]
+    if total_delta <= 0:
+        return 0.0
+    return 100.0 * (1 - idle_delta / total_delta)
+
+
+def _read_meminfo() -> Dict[str, int]:
+    """Parse /proc/meminfo.
+
+    Returns:
+        Mapping of field name to value in bytes (empty if unavailable)
+    """
+    info: Dict[str, int] = {}
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                parts = rest.split()
+                if parts:
+                    info[key] = int(parts[0]) * 1024  # values are in kB
+    except (OSError, ValueError):
+        pass
+    return info
+
+
+def _tail(path: str, lines: int) -> str:
+    """Return the last lines of a file without spawning tail.
+
+    Args:
+        path: File to read
+        lines: Number of trailing lines to return
+
+    Returns:
+        The trailing lines (empty if the file is empty)
+
+    Raises:
+        OSError: If the file can't be read, e.g. for lack of permission
+    """
+    with open(path, "rb") as f:
+        size = f.seek(0, os.SEEK_END)
+        start = max(0, size - _TAIL_BYTES)
+        f.seek(start)
+        chunk = f.read()
+
+    text = chunk.decode("utf-8", "replace").splitlines()
+    if start > 0 and text:
+        text = text[1:]  # first line is cut off
+    tail = text[-lines:]
+    return "\n".join(tail) + "\n" if tail else ""
+
+
+def _tail_files(paths: List[str], lines: int) -> List[str]:
+    """Tail several log files, using a single sudo call for unreadable ones.
+
+    Args:
+        paths: Files to read
+        lines: Number of trailing lines per file
+
+    Returns:
+        Trailing lines per path, in order; empty for missing files
+    """
+    results: Dict[str, str] = {}
+    privileged: List[str] = []
+    for path in paths:
+        try:
+            results[path] = _tail(path, lines)
+        except FileNotFoundError:
+            results[path] = ""
+        except OSError:
+            privileged.append(path)
+
+    if privileged:
+        commands: List[List[str]] = []
+        for i, path in enumerate(privileged):
+            if i:
+                commands.append(["echo", _TAIL_SEPARATOR])
+            commands.append(["tail", "-n", str(lines), path])
+        _, stdout, _ = run_sudo_batch(commands, show_command=False, stop_on_error=False)
+        parts = stdout.split(f"{_TAIL_SEPARATOR}\n")
+        for i, path in enumerate(privileged):
+            results[path] = parts[i] if i < len(parts) else ""
+
+    return [results[path] for path in paths]
+
+
+def _format_bytes(size: float) -> str:
+    """Format a byte count like `free -h`/`df -h` do."""
+    if size < 1024:
+        return f"{int(size)}B"
+    for unit in ("K", "M", "G", "T"):
+        size /= 1024
+        if size < 1024 or unit == "T":
+            break
+    return f"{size:.1f}{unit}"
+
+
+def _format_uptime(seconds: float) -> str:
+    """Format seconds of uptime as days, hours and minutes."""
+    minutes, _ = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    days, hours = divmod(hours, 24)
+    if days:
+        return f"{days}d {hours}h {minutes}m"
+    return f"{hours}h {minutes}m"
+
 
 class SystemMonitor:
     """System monitoring and status utilities."""
 
+    _MENU_OPTIONS = (
+        "Resource Usage (CPU, Memory, Disk)",
+        "Running Services",
+        "Failed Services",
+        "Network Connections",
+        "Recent Logs",
+    )
+
     def show_menu(self) -> bool:
         """Show monitoring menu.
 
@@ -27,15 +191,7 @@ class SystemMonitor:
             clear_screen()
             print_header("System Monitoring")
 
-            options = [
-                "Resource Usage (CPU, Memory, Disk)",
-                "Running Services",
-                "Failed Services",
-                "Network Connections",
-                "Recent Logs",
-            ]
-
-            choice = select_from_list(options, "Select option:")
+            choice = select_from_list(self._MENU_OPTIONS, "Select option:")
             if choice is None:
                 return True
 
@@ -59,25 +215,58 @@ class SystemMonitor:
         clear_screen()
         print_header("System Resources")
 
-        # CPU info
+        # Read straight from /proc and statvfs: no top/free/df/uptime
+        # processes, and no one-second top sample
         console.print("[bold cyan]CPU Usage:[/bold cyan]")
-        _, stdout, _ = run_command(["bash", "-c", "top -bn1 | head -5"])
-        console.print(stdout)
+        cpu = _cpu_percent()
+        cpu_text = f"{cpu:.1f}%" if cpu is not None else "unavailable"
+        console.print(f"  {cpu_text} across {os.cpu_count() or 1} CPU(s)")
 
         # Memory info
-        console.print("\n[bold cyan]Memory Usage:[/bold cyan]")
-        _, stdout, _ = run_command(["free", "-h"])
-        console.print(stdout)
+        console.print()
+        mem = _read_meminfo()
+        if mem:
+            mem_total = mem.get("MemTotal", 0)
+            mem_avail = mem.get("MemAvailable", mem.get("MemFree", 0))
+            swap_total = mem.get("SwapTotal", 0)
+            swap_free = mem.get("SwapFree", 0)
+            display_table(
+                "Memory Usage",
+                ["", "Total", "Used", "Available"],
+                [
+                    ["Mem", _format_bytes(mem_total), _format_bytes(mem_total - mem_avail),
+                     _format_bytes(mem_avail)],
+                    ["Swap", _format_bytes(swap_total), _format_bytes(swap_total - swap_free),
+                     _format_bytes(swap_free)],
+                ],
+            )
+        else:
+            print_warning("Memory information unavailable.")
 
         # Disk usage
-        console.print("\n[bold cyan]Disk Usage:[/bold cyan]")
-        _, stdout, _ = run_command(["df", "-h", "/"])
-        console.print(stdout)
+        console.print()
+        disk = shutil.disk_usage("/")
+        display_table(
+            "Disk Usage (/)",
+            ["Size", "Used", "Available", "Use%"],
+            [[
+                _format_bytes(disk.total),
+                _format_bytes(disk.used),
+                _format_bytes(disk.free),
+                f"{100 * disk.used / disk.total:.0f}%" if disk.total else "-",
+            ]],
+        )
 
         # Load average
         console.print("\n[bold cyan]Load Average:[/bold cyan]")
-        _, stdout, _ = run_command(["uptime"])
-        console.print(stdout)
+        load1, load5, load15 = os.getloadavg()
+        uptime_text = ""
+        try:
+            with open("/proc/uptime") as f:
+                uptime_text = f", up {_format_uptime(float(f.read().split()[0]))}"
+        except (OSError, ValueError, IndexError):
+            pass
+        console.print(f"  {load1:.2f}, {load5:.2f}, {load15:.2f} (1, 5, 15 min){uptime_text}")
 
         pause()
         return True
@@ -91,13 +280,13 @@ class SystemMonitor:
         clear_screen()
         print_header("Running Services")
 
-        _, stdout, _ = run_sudo([
+        # Echoed as systemctl writes it rather than buffered whole
+        run_sudo_streaming([
             "systemctl", "list-units",
             "--type=service",
             "--state=running",
             "--no-pager"
         ], show_command=False)
-        console.print(stdout)
 
         pause()
         return True
@@ -142,8 +331,8 @@ class SystemMonitor:
 
         # Active connections count
         console.print("\n[bold cyan]Connection Summary:[/bold cyan]")
-        _, stdout, _ = run_command(["bash", "-c", "ss -s | head -10"])
-        console.print(stdout)
+        _, stdout, _ = run_command(["ss", "-s"])
+        console.print("\n".join(stdout.splitlines()[:10]))
 
         # IP addresses
         console.print("\n[bold cyan]IP Addresses:[/bold cyan]")
@@ -177,17 +366,20 @@ class SystemMonitor:
 
         if choice == 0:
             print_header("System Logs")
-            _, stdout, _ = run_sudo(["journalctl", "-n", "50", "--no-pager"], show_command=False)
-            console.print(stdout)
+            run_sudo_streaming(
+                ["journalctl", "-n", "50", "--no-pager", "--output=short-precise"],
+                show_command=False,
+            )
 
         elif choice == 1:
             print_header("Nginx Logs")
+            access, error = _tail_files(
+                ["/var/log/nginx/access.log", "/var/log/nginx/error.log"], 20
+            )
             console.print("[bold]Access Log:[/bold]")
-            _, stdout, _ = run_sudo(["tail", "-20", "/var/log/nginx/access.log"], show_command=False)
-            console.print(stdout if stdout else "[dim]No access log entries[/dim]")
+            console.print(access if access else "[dim]No access log entries[/dim]")
             console.print("\n[bold]Error Log:[/bold]")
-            _, stdout, _ = run_sudo(["tail", "-20", "/var/log/nginx/error.log"], show_command=False)
-            console.print(stdout if stdout else "[dim]No error log entries[/dim]")
+            console.print(error if error else "[dim]No error log entries[/dim]")
 
         elif choice == 2:
             print_header("SSH Auth Logs")
@@ -197,23 +389,31 @@ class SystemMonitor:
                 "/var/log/secure",
             ]
             found = False
-            for log_file in log_files:
-                success, stdout, _ = run_sudo(
-                    ["tail", "-50", log_file],
-                    show_command=False
-                )
-                if success and stdout:
+            for stdout in _tail_files(log_files, 50):
+                if stdout:
                     console.print(stdout)
                     found = True
                     break
             if not found:
-                _, stdout, _ = run_sudo(["journalctl", "-u", "sshd", "-n", "50", "--no-pager"], show_command=False)
-                console.print(stdout)
+                # Match the sshd binaries rather than a unit: the unit is
+                # ssh.service on Debian/Ubuntu and sshd.service elsewhere.
+                # Since OpenSSH 9.8 sessions (and, in 10.0, auth) log from
+                # separate binaries; repeated matches on a field are ORed
+                run_sudo_streaming(
+                    [
+                        "journalctl",
+                        "_COMM=sshd", "_COMM=sshd-session", "_COMM=sshd-auth",
+                        "-n", "50", "--no-pager", "--output=short",
+                    ],
+                    show_command=False,
+                )
 
         elif choice == 3:
             print_header("Kernel Messages")
-            _, stdout, _ = run_sudo(["bash", "-c", "dmesg --time-format=reltime | tail -50"], show_command=False)
-            console.print(stdout)
+            # Only the newest lines are kept while reading the ring buffer
+            lines: deque = deque(maxlen=50)
+            run_sudo_lines(["dmesg", "--time-format=reltime"], lines.append)
+            console.print("".join(lines), end="")
 
         pause()
         return True
@@ -1,8 +1,10 @@
 """Common tool installation (package manager + script installers)."""
 
-from typing import List, Dict, Tuple
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Set, Tuple
 
-from ...utils.command import run_command, run_sudo, check_command_exists
+from ...utils.command import run_command, run_sudo
 from ...utils.distro import detect_distro, get_install_command, get_update_command, PackageManager
 from ...utils.ui import (
     console,
@@ -171,6 +173,48 @@ SCRIPT_TOOLS: Dict[str, Dict[str, str]] = {
     },
 }
 
+# Names of everything in the PATH directories, built by one scan
+_path_executables_cache: Optional[Set[str]] = None
+
+# Status checks run concurrently when a whole catalog is shown
+_STATUS_WORKERS = 8
+
+
+def _path_executables() -> Set[str]:
+    """Get the names of all executable files in the PATH directories.
+
+    One scandir per PATH entry replaces a which() walk of every PATH
+    entry per tool. Call _clear_path_executables() after installs.
+
+    Returns:
+        Set of executable names found on PATH
+    """
+    global _path_executables_cache
+    if _path_executables_cache is None:
+        names: Set[str] = set()
+        for directory in os.environ.get("PATH", os.defpath).split(os.pathsep):
+            try:
+                with os.scandir(directory or ".") as entries:
+                    for entry in entries:
+                        if entry.name in names:
+                            continue
+                        # Same test as shutil.which: an executable file
+                        try:
+                            if entry.is_file() and os.access(entry.path, os.X_OK):
+                                names.add(entry.name)
+                        except OSError:
+                            pass
+            except OSError:
+                pass
+        _path_executables_cache = names
+    return _path_executables_cache
+
+
+def _clear_path_executables():
+    """Forget the PATH scan so newly installed commands are seen."""
+    global _path_executables_cache
+    _path_executables_cache = None
+
 
 class PackagesManager:
     """Manages common package installation."""
@@ -178,6 +222,22 @@ class PackagesManager:
     def __init__(self):
         self.distro = detect_distro()
         self.pm = self.distro.package_manager
+        # Install status per tool, hits and misses alike; updated by installs
+        self._installed_cache: Dict[str, bool] = {}
+
+        # self.pm is fixed for the process, so resolve names once
+        apt = self.pm == PackageManager.APT
+        pm_key = self.pm.value
+        self._pkg_names: Dict[str, str] = {
+            tool: info.get(pm_key, tool) for tool, info in COMMON_PACKAGES.items()
+        }
+        self._pkg_names.update(
+            (tool, info.get("command", tool)) for tool, info in SCRIPT_TOOLS.items()
+        )
+        self._cmd_names: Dict[str, str] = {
+            tool: (apt and info.get("command_apt")) or info.get("command", tool)
+            for tool, info in COMMON_PACKAGES.items()
+        }
 
     def _all_tools(self) -> List[str]:
         """Return catalog in deterministic order."""
@@ -196,13 +256,7 @@ class PackagesManager:
         Returns:
             Package name for current distro
         """
-        if self._is_script_tool(tool):
-            return SCRIPT_TOOLS[tool].get("command", tool)
-
-        pkg_info = COMMON_PACKAGES.get(tool, {})
-        pm_key = self.pm.value
-
-        return pkg_info.get(pm_key, tool)
+        return self._pkg_names.get(tool, tool)
 
     def _get_command_name(self, tool: str) -> str:
         """Get the command name to check if tool is installed.
@@ -213,33 +267,48 @@ class PackagesManager:
         Returns:
             Command name for current distro
         """
-        pkg_info = COMMON_PACKAGES.get(tool, {})
-
-        # Check for distro-specific command name override
-        if self.pm == PackageManager.APT:
-            cmd = pkg_info.get("command_apt")
-            if cmd:
-                return cmd
-
-        return pkg_info.get("command", tool)
+        return self._cmd_names.get(tool, tool)
 
-    def _is_installed(self, tool: str) -> bool:
+    def _is_installed(self, tool: str, cmd: Optional[str] = None) -> bool:
         """Check if a tool is installed.
 
         Args:
             tool: Tool name
+            cmd: Command name, if the caller already looked it up
 
         Returns:
             True if installed
         """
+        cached = self._installed_cache.get(tool)
+        if cached is not None:
+            return cached
+
         if tool == "nvm-node":
             marker_rc, _, _ = run_command(["bash", "-lc", "test -s \"$HOME/.nvm/nvm.sh\""])
-            if marker_rc != 0:
-                return False
-            return check_command_exists("node")
+            installed = marker_rc == 0 and "node" in _path_executables()
+        else:
+            installed = (cmd or self._get_command_name(tool)) in _path_executables()
+
+        self._installed_cache[tool] = installed
+        return installed
+
+    def _prime_installed_cache(self, tools: List[str]):
+        """Check install status for many tools at once.
 
-        cmd = self._get_command_name(tool)
-        return check_command_exists(cmd)
+        PATH lookups are cheap once the PATH scan exists; the nvm-node
+        probe spawns a login shell, so running the checks on a pool
+        hides that behind the rest.
+
+        Args:
+            tools: Tools whose status will be shown
+        """
+        pending = [tool for tool in tools if tool not in self._installed_cache]
+        if not pending:
+            return
+
+        _path_executables()  # build once here rather than racing in workers
+        with ThreadPoolExecutor(max_workers=_STATUS_WORKERS) as executor:
+            list(executor.map(self._is_installed, pending))
 
     def _display_name(self, tool: str) -> str:
         """Get display name for tool."""
@@ -403,7 +472,24 @@ class PackagesManager:
         success_tools: List[str] = []
         failed_tools: List[str] = []
 
-        for tool in tools:
+        # All package-manager tools go in one transaction: one lock, one
+        # index load. If it fails (e.g. one package unavailable on this
+        # distro), fall back to per-tool installs to see which ones work
+        remaining = tools
+        if len(pm_tools) > 1:
+            packages = [self._get_package_name(tool) for tool in pm_tools]
+            console.print(f"\n[dim]Installing {', '.join(packages)}...[/dim]")
+            success, _, _ = run_sudo(get_install_command(packages, self.pm))
+            if success:
+                _clear_path_executables()
+                for tool in pm_tools:
+                    self._installed_cache[tool] = True
+                success_tools.extend(pm_tools)
+                remaining = [tool for tool in tools if tool not in pm_tools]
+            else:
+                print_warning("Combined install failed; installing tools one by one.")
+
+        for tool in remaining:
             console.print(f"\n[dim]Installing {self._display_name(tool)}...[/dim]")
             ok = self.install_package(tool)
             if ok:
@@ -443,16 +529,16 @@ class PackagesManager:
 
         # Show full catalog with install status
         tools = self._all_tools()
-        items: List[str] = []
-        for name in tools:
-            installed = self._is_installed(name)
-            status = "[green]✓[/green]" if installed else "[dim]○[/dim]"
-            install_kind = "script" if self._is_script_tool(name) else self.pm.value
-            items.append(
-                f"{status} {self._display_name(name)} - {self._description(name)} [dim]({install_kind})[/dim]"
-            )
-
-        missing_indices = [i for i, tool in enumerate(tools) if not self._is_installed(tool)]
+        self._prime_installed_cache(tools)
+        installed = [self._is_installed(name) for name in tools]
+        items: List[str] = [
+            f"{'[green]✓[/green]' if ok else '[dim]○[/dim]'} {self._display_name(name)} - "
+            f"{self._description(name)} "
+            f"[dim]({'script' if self._is_script_tool(name) else self.pm.value})[/dim]"
+            for name, ok in zip(tools, installed)
+        ]
+
+        missing_indices = [i for i, ok in enumerate(installed) if not ok]
         special_keywords = {
             "all": list(range(len(tools))),
             "*": list(range(len(tools))),
@@ -512,6 +598,10 @@ class PackagesManager:
             print_info(f"{tool} is already installed.")
             return True
 
+        # Installers re-check status afterwards; don't let them see the miss
+        self._installed_cache.pop(tool, None)
+        _clear_path_executables()
+
         if self._is_script_tool(tool):
             return self._install_script_tool(tool)
 
@@ -522,6 +612,8 @@ class PackagesManager:
         success, _, _ = run_sudo(install_cmd)
 
         if success:
+            _clear_path_executables()
+            self._installed_cache[tool] = True
             print_success(f"{tool} installed.")
         else:
             print_error(f"Failed to install {tool}.")
@@ -538,6 +630,7 @@ class PackagesManager:
         print_header("Installing All Tools")
 
         # Find missing tools
+        self._prime_installed_cache(self._all_tools())
         missing = [tool for tool in self._all_tools() if not self._is_installed(tool)]
 
         if not missing:
@@ -564,18 +657,15 @@ class PackagesManager:
         clear_screen()
         print_header("Installed Tools")
 
-        for name in self._all_tools():
-            installed = self._is_installed(name)
+        tools = self._all_tools()
+        self._prime_installed_cache(tools)
+        for name in tools:
             cmd = self._get_command_name(name)
+            status = "[green]✓[/green]" if self._is_installed(name, cmd) else "[dim]○[/dim]"
             cmd_info = f" (cmd: {cmd})" if cmd != name else ""
-            if installed:
-                console.print(
-                    f"  [green]✓[/green] {self._display_name(name)}{cmd_info} - {self._description(name)}"
-                )
-            else:
-                console.print(
-                    f"  [dim]○[/dim] {self._display_name(name)}{cmd_info} - {self._description(name)}"
-                )
+            console.print(
+                f"  {status} {self._display_name(name)}{cmd_info} - {self._description(name)}"
+            )
 
         pause()
         return True
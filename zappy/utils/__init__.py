@@ -1,25 +1,57 @@
 """Utility modules for Zappy the VPS Toolbox."""
 
-from .command import run_sudo, run_command, check_command_exists
-from .distro import detect_distro, get_package_manager
-from .ui import console, clear_screen, print_header, print_success, print_error, print_warning, confirm, select_from_list
-from .validators import validate_domain, validate_port, validate_ip
-
-__all__ = [
-    "run_sudo",
-    "run_command",
-    "check_command_exists",
-    "detect_distro",
-    "get_package_manager",
-    "console",
-    "clear_screen",
-    "print_header",
-    "print_success",
-    "print_error",
-    "print_warning",
-    "confirm",
-    "select_from_list",
-    "validate_domain",
-    "validate_port",
-    "validate_ip",
-]
+import importlib
+from typing import Any, List
+
+# Re-exported names by submodule. They are resolved on first access
+# (PEP 562), so importing e.g. zappy.utils.validators doesn't also load
+# ui.py and build the rich console.
+_EXPORTS = {
+    "run_sudo": ".command",
+    "run_command": ".command",
+    "check_command_exists": ".command",
+    "detect_distro": ".distro",
+    "get_package_manager": ".distro",
+    "console": ".ui",
+    "clear_screen": ".ui",
+    "print_header": ".ui",
+    "print_success": ".ui",
+    "print_error": ".ui",
+    "print_warning": ".ui",
+    "confirm": ".ui",
+    "select_from_list": ".ui",
+    "validate_domain": ".validators",
+    "validate_port": ".validators",
+    "validate_ip": ".validators",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    """Import a re-exported name from its submodule on first access.
+
+    Args:
+        name: Attribute being looked up
+
+    Returns:
+        The re-exported object, also cached in the package namespace
+
+    Raises:
+        AttributeError: If the name isn't a re-export
+    """
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    """List module attributes, including re-exports not yet imported.
+
+    Returns:
+        Sorted attribute names
+    """
+    return sorted(set(globals()) | set(__all__))
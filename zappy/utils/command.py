@@ -1,9 +1,55 @@
 """Command execution utilities with sudo support."""
 
+import os
+import shlex
+import stat
 import subprocess
 import shutil
-from typing import Optional, Tuple, List, Union
-from .ui import console, print_error
+import threading
+import time
+from collections import deque
+from typing import BinaryIO, Callable, Dict, Optional, Set, Tuple, List, Union
+from .ui import _get_console, print_error, print_info
+
+# Commands already found in PATH. Only hits are remembered: a command
+# rarely disappears mid-session, while a missing one may be installed
+# by the very next action.
+_found_commands: Set[str] = set()
+# Absolute paths of executables already resolved, for the spawn fast path
+_resolved_paths: Dict[str, str] = {}
+
+# Running as root already: privileged commands run directly, without sudo
+_IS_ROOT = os.geteuid() == 0
+
+# When verify_sudo() last succeeded (time.monotonic()); failures aren't cached
+_sudo_verified_at: Optional[float] = None
+_SUDO_VERIFY_TTL = 300
+
+
+def _usable_cpus() -> int:
+    """CPUs this process may run on, honouring affinity/cgroup cpusets."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+# Default run_many() concurrency; small VPS plans often expose one CPU
+_DEFAULT_WORKERS = max(2, _usable_cpus())
+
+
+def as_root(command: List[str]) -> List[str]:
+    """Prefix a command with sudo unless this process is already root.
+
+    Args:
+        command: Command as a list of arguments
+
+    Returns:
+        Command to execute with root privileges
+    """
+    if _IS_ROOT:
+        return command
+    return ["sudo"] + command
 
 
 def check_command_exists(command: str) -> bool:
@@ -15,7 +61,48 @@ def check_command_exists(command: str) -> bool:
     Returns:
         True if command exists, False otherwise
     """
-    return shutil.which(command) is not None
+    if command in _found_commands:
+        return True
+
+    if shutil.which(command) is None:
+        return False
+
+    _found_commands.add(command)
+    return True
+
+
+def clear_command_cache():
+    """Forget cached check_command_exists() hits and resolved paths.
+
+    Call after anything that may have removed commands from PATH.
+    """
+    _found_commands.clear()
+    _resolved_paths.clear()
+
+
+def _resolve_argv(command: List[str]) -> List[str]:
+    """Replace a bare program name with its absolute path.
+
+    subprocess only takes the posix_spawn fast path (no fork of this
+    process's page tables) when the executable is given by path and
+    close_fds is off; Python's own descriptors are non-inheritable
+    (PEP 446), so keeping close_fds off leaks nothing.
+    """
+    name = command[0]
+    if os.sep in name:
+        return command
+    path = _resolved_paths.get(name)
+    if path is None:
+        path = shutil.which(name)
+        if path is None:
+            return command
+        _resolved_paths[name] = path
+    return [path] + command[1:]
+
+
+def _decode(data: Optional[bytes]) -> str:
+    """Decode captured process output, tolerating invalid UTF-8."""
+    return data.decode("utf-8", "replace") if data else ""
 
 
 def run_command(
@@ -38,20 +125,22 @@ def run_command(
         Tuple of (return_code, stdout, stderr)
     """
     if isinstance(command, str):
-        command = command.split()
+        command = shlex.split(command)
 
+    # Pipes are read as bytes and decoded once here, rather than through
+    # a TextIOWrapper per stream
     try:
         result = subprocess.run(
-            command,
+            _resolve_argv(command),
+            close_fds=False,
             capture_output=capture_output,
-            text=True,
             check=check,
             timeout=timeout,
-            input=input_text,
+            input=input_text.encode() if input_text is not None else None,
         )
-        return result.returncode, result.stdout or "", result.stderr or ""
+        return result.returncode, _decode(result.stdout), _decode(result.stderr)
     except subprocess.CalledProcessError as e:
-        return e.returncode, e.stdout or "", e.stderr or ""
+        return e.returncode, _decode(e.stdout), _decode(e.stderr)
     except subprocess.TimeoutExpired:
         return -1, "", "Command timed out"
     except FileNotFoundError:
@@ -60,6 +149,132 @@ def run_command(
         return -1, "", str(e)
 
 
+def run_command_streaming(command: List[str], tail: int = 200) -> Tuple[int, str]:
+    """Run a command, echoing its output live and keeping only the tail.
+
+    Long installers print thousands of lines; buffering all of it only
+    to show it afterwards (or not at all) wastes memory and leaves the
+    user staring at a silent screen.
+
+    Args:
+        command: Command to run as a list of arguments
+        tail: Number of trailing output lines to keep
+
+    Returns:
+        Tuple of (return_code, last lines of combined stdout/stderr)
+    """
+    lines: deque = deque(maxlen=tail)
+    try:
+        process = subprocess.Popen(
+            _resolve_argv(command),
+            close_fds=False,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            text=True,
+            errors="replace",
+            bufsize=1,
+        )
+    except FileNotFoundError:
+        return -1, f"Command not found: {command[0]}"
+    except Exception as e:
+        return -1, str(e)
+
+    console = _get_console()
+    with process:
+        for line in process.stdout:
+            console.out(line.rstrip("\n"), highlight=False)
+            lines.append(line)
+        returncode = process.wait()
+    return returncode, "".join(lines)
+
+
+def run_sudo_streaming(
+    command: List[str],
+    tail: int = 200,
+    show_command: bool = True,
+) -> Tuple[bool, str]:
+    """Run a command with sudo, echoing its output live.
+
+    Args:
+        command: Command to run as a list of arguments
+        tail: Number of trailing output lines to keep
+        show_command: Whether to display the command being run
+
+    Returns:
+        Tuple of (success, last lines of combined output)
+    """
+    full_command = as_root(command)
+
+    if show_command:
+        _get_console().print(f"[dim]Running: {' '.join(full_command)}[/dim]")
+
+    returncode, output = run_command_streaming(full_command, tail=tail)
+    return returncode == 0, output
+
+
+def run_sudo_lines(command: List[str], on_line: Callable[[str], None]) -> bool:
+    """Run a command with sudo, handing each output line to a callback.
+
+    For output that is parsed rather than shown verbatim, so it never
+    has to be held in memory as a whole.
+
+    Args:
+        command: Command to run as a list of arguments
+        on_line: Called with each line of combined stdout/stderr
+
+    Returns:
+        True if the command exited successfully, False otherwise
+    """
+    try:
+        process = _popen_sudo(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            text=True,
+            errors="replace",
+        )
+    except Exception as e:
+        print_error(f"Command failed: {e}")
+        return False
+
+    with process:
+        for line in process.stdout:
+            on_line(line)
+    return process.returncode == 0
+
+
+def run_many(
+    commands: List[List[str]],
+    timeout: Optional[int] = None,
+    max_workers: Optional[int] = None,
+) -> List[Tuple[int, str, str]]:
+    """Run independent commands concurrently.
+
+    Waiting on a subprocess releases the GIL, so the total wall time is
+    roughly that of the slowest command rather than the sum.
+
+    Args:
+        commands: Commands to run, each as a list of arguments
+        timeout: Per-command timeout in seconds
+        max_workers: Maximum number of commands running at once
+            (defaults to the usable CPU count, at least 2)
+
+    Returns:
+        List of (return_code, stdout, stderr) tuples in input order
+    """
+    if len(commands) <= 1:
+        return [run_command(cmd, timeout=timeout) for cmd in commands]
+
+    # Most callers pass a single command; only load the pool when needed
+    from concurrent.futures import ThreadPoolExecutor
+
+    workers = min(max_workers or _DEFAULT_WORKERS, len(commands))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda cmd: run_command(cmd, timeout=timeout), commands))
+
+
 def run_sudo(
     command: Union[str, List[str]],
     capture_output: bool = True,
@@ -82,12 +297,12 @@ def run_sudo(
         Tuple of (success, stdout, stderr)
     """
     if isinstance(command, str):
-        command = command.split()
+        command = shlex.split(command)
 
-    full_command = ["sudo"] + command
+    full_command = as_root(command)
 
     if show_command:
-        console.print(f"[dim]Running: {' '.join(full_command)}[/dim]")
+        _get_console().print(f"[dim]Running: {' '.join(full_command)}[/dim]")
 
     returncode, stdout, stderr = run_command(
         full_command,
@@ -105,19 +320,75 @@ def run_sudo(
     return success, stdout, stderr
 
 
-def write_file_sudo(path: str, content: str) -> bool:
-    """Write content to a file using sudo tee.
+def run_sudo_batch(
+    commands: List[List[str]],
+    capture_output: bool = True,
+    timeout: Optional[int] = None,
+    show_command: bool = True,
+    stop_on_error: bool = True,
+) -> Tuple[bool, str, str]:
+    """Run several commands under a single sudo invocation.
+
+    Commands are chained with ``&&`` so the batch stops at the first failure,
+    or run one after another regardless, with the batch failing if any of
+    them did.
+
+    Args:
+        commands: Commands to run, each as a list of arguments
+        capture_output: Whether to capture stdout/stderr
+        timeout: Timeout in seconds for the whole batch
+        show_command: Whether to display the commands being run
+        stop_on_error: Whether to stop at the first failing command
+
+    Returns:
+        Tuple of (success, stdout, stderr)
+    """
+    if stop_on_error:
+        script = " && ".join(shlex.join(cmd) for cmd in commands)
+    else:
+        # Remember any failure instead of reporting only the last command's
+        script = "rc=0; " + "".join(f"{shlex.join(cmd)} || rc=1; " for cmd in commands) + "exit $rc"
+
+    if show_command:
+        _get_console().print(f"[dim]Running: sudo sh -c {shlex.quote(script)}[/dim]")
+
+    return run_sudo(
+        ["sh", "-c", script],
+        capture_output=capture_output,
+        timeout=timeout,
+        show_command=False,
+    )
+
+
+def _popen_sudo(args: List[str], **kwargs) -> subprocess.Popen:
+    """Start a command as root in a way that lets CPython use posix_spawn."""
+    return subprocess.Popen(_resolve_argv(as_root(args)), close_fds=False, **kwargs)
+
+
+def write_file_sudo(path: str, content: str, mode: str = "644") -> bool:
+    """Write content to a file using sudo.
+
+    New files are laid down with sudo install and an explicit mode. An
+    existing file is rewritten in place with tee instead, so it keeps its
+    mode and owner (sshd_config is 0600 on RHEL) and a symlinked target
+    is written through rather than replaced.
 
     Args:
         path: File path to write to
         content: Content to write
+        mode: Permission bits if the file is created
 
     Returns:
         True on success, False on failure
     """
+    if os.path.lexists(path):
+        command = ["tee", path]
+    else:
+        command = ["install", "-m", mode, "/dev/stdin", path]
+
     try:
-        process = subprocess.Popen(
-            ["sudo", "tee", path],
+        process = _popen_sudo(
+            command,
             stdin=subprocess.PIPE,
             stdout=subprocess.DEVNULL,
             stderr=subprocess.PIPE,
@@ -134,8 +405,90 @@ def write_file_sudo(path: str, content: str) -> bool:
         return False
 
 
+def update_file_sudo(path: str, content: str) -> bool:
+    """Write content to a file using sudo, skipping identical content.
+
+    The current file is read via read_file_sudo, without sudo when
+    permissions allow, so an unchanged config costs no sudo call at all.
+
+    Args:
+        path: File path to write to
+        content: Content to write
+
+    Returns:
+        True if the file now holds the content, False on failure
+    """
+    if read_file_sudo(path) == content:
+        print_info(f"{path} is already up to date.")
+        return True
+    return write_file_sudo(path, content)
+
+
+def write_stream_sudo(
+    path: str,
+    writer: Callable[[BinaryIO], bool],
+    mode: str = "644",
+) -> bool:
+    """Stream content into a file using sudo install, without buffering it.
+
+    The content goes to a temporary file next to the target, which is
+    moved into place only once the writer has finished successfully, so
+    an interrupted download never leaves a truncated file behind. An
+    existing target keeps its mode, and a symlinked target is replaced
+    at the file it points to.
+
+    Args:
+        path: File path to write to
+        writer: Callback that writes bytes to the given pipe, returning
+            True on success
+        mode: Permission bits if the file is created
+
+    Returns:
+        True on success, False on failure
+    """
+    target = os.path.realpath(path)
+    try:
+        mode = f"{stat.S_IMODE(os.stat(target).st_mode):o}"
+    except OSError:
+        pass
+    tmp_path = f"{target}.zappy-tmp"
+
+    try:
+        process = _popen_sudo(
+            ["install", "-m", mode, "/dev/stdin", tmp_path],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+    except Exception as e:
+        print_error(f"Failed to write file: {e}")
+        return False
+
+    try:
+        ok = writer(process.stdin)
+    except OSError:
+        ok = False
+
+    # Closing stdin lets install finish; on failure its output is discarded
+    _, stderr = process.communicate()
+
+    if ok and process.returncode == 0:
+        # run_sudo reports a failed move itself
+        moved, _, _ = run_sudo(["mv", "-f", tmp_path, target], show_command=False)
+        if moved:
+            return True
+    elif ok:
+        print_error(f"Failed to write file: {stderr.decode(errors='replace')}")
+
+    run_sudo(["rm", "-f", tmp_path], show_command=False)
+    return False
+
+
 def read_file_sudo(path: str) -> Optional[str]:
-    """Read a file using sudo.
+    """Read a file, using sudo only if it isn't readable otherwise.
+
+    Most configs (nginx sites, sshd_config) are world-readable, so the
+    plain read usually saves spawning sudo cat.
 
     Args:
         path: File path to read
@@ -143,6 +496,14 @@ def read_file_sudo(path: str) -> Optional[str]:
     Returns:
         File content or None on failure
     """
+    try:
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+    except (OSError, UnicodeDecodeError):
+        pass
+
     success, stdout, stderr = run_sudo(["cat", path], show_command=False)
     if success:
         return stdout
@@ -159,15 +520,106 @@ def backup_file(source: str, dest: str) -> bool:
     Returns:
         True on success, False on failure
     """
-    success, _, _ = run_sudo(["cp", source, dest], show_command=False)
+    # A backup dir the user already owns needs no sudo round trip. As root
+    # that buys nothing, so the reflink-capable cp below is kept instead
+    if not _IS_ROOT and os.access(os.path.dirname(dest) or ".", os.W_OK):
+        try:
+            shutil.copy(source, dest)
+            return True
+        except OSError:
+            pass
+
+    # Reflink clones are O(1) on btrfs/XFS and still independent of the
+    # source; busybox cp lacks --reflink, hence the plain cp fallback
+    script = 'cp --reflink=auto "$1" "$2" 2>/dev/null || cp "$1" "$2"'
+    success, _, _ = run_sudo(["sh", "-c", script, "sh", source, dest], show_command=False)
     return success
 
 
+def wait_for_service(unit: str, timeout: float = 2.0) -> bool:
+    """Poll systemd until a unit has no queued job and is active.
+
+    Pairs with ``systemctl --no-block`` so a slow or broken unit can't
+    hang the UI on systemd's default job timeout.
+
+    Args:
+        unit: systemd unit name
+        timeout: Maximum seconds to wait
+
+    Returns:
+        True if the unit is active, False if it failed or is still pending
+    """
+    delay = 0.1
+    deadline = time.monotonic() + timeout
+    while True:
+        returncode, stdout, _ = run_command(
+            ["systemctl", "show", unit, "-p", "ActiveState", "-p", "Job"]
+        )
+        if returncode != 0:
+            return False
+
+        props = dict(line.partition("=")[::2] for line in stdout.splitlines())
+        state = props.get("ActiveState")
+        if not props.get("Job"):
+            if state == "active":
+                return True
+            if state in ("failed", "inactive"):
+                return False
+
+        if time.monotonic() + delay > deadline:
+            return False
+        time.sleep(delay)
+        delay *= 2
+
+
 def verify_sudo() -> bool:
     """Verify that sudo is available and user has permissions.
 
+    A success is reused for _SUDO_VERIFY_TTL seconds, comfortably inside
+    sudo's default 15-minute timestamp_timeout.
+
     Returns:
         True if sudo is available, False otherwise
     """
+    global _sudo_verified_at
+
+    if _IS_ROOT:
+        return True
+
+    now = time.monotonic()
+    if _sudo_verified_at is not None and now - _sudo_verified_at < _SUDO_VERIFY_TTL:
+        return True
+
     returncode, _, _ = run_command(["sudo", "-v"])
-    return returncode == 0
+    if returncode != 0:
+        return False
+    _sudo_verified_at = now
+    return True
+
+
+def keep_sudo_alive(interval: int = 60) -> Optional[threading.Thread]:
+    """Refresh the sudo timestamp in the background for the session.
+
+    Without this, a long session outlives sudo's timestamp_timeout and
+    a later command stops to prompt for the password again.
+
+    Args:
+        interval: Seconds between refreshes
+
+    Returns:
+        The daemon thread doing the refreshes, or None when running as root
+    """
+    if _IS_ROOT:
+        return None
+
+    def _refresh():
+        while True:
+            time.sleep(interval)
+            # -n: never prompt from the background; just stop refreshing
+            returncode, _, _ = run_command(["sudo", "-n", "-v"])
+            if returncode != 0:
+                return
+
+    thread = threading.Thread(target=_refresh, daemon=True)
+    thread.start()
+    return thread
@@ -1,10 +1,10 @@
 """Linux distribution detection and package manager utilities."""
 
-import os
+import platform
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional, List
-from pathlib import Path
+from functools import lru_cache
+from typing import Dict, Optional, List, Tuple
 
 
 class PackageManager(Enum):
@@ -18,24 +18,84 @@ class PackageManager(Enum):
     UNKNOWN = "unknown"
 
 
-@dataclass
+# Distro IDs recognised by the DistroInfo family checks
+_DEBIAN_IDS = frozenset({"debian", "ubuntu"})
+_RHEL_IDS = frozenset({"rhel", "centos", "fedora", "rocky", "alma"})
+_RHEL_LIKE = frozenset({"rhel", "fedora", "centos"})
+_SUSE_IDS = frozenset({"opensuse", "sles"})
+
+# Package manager by distro ID; RHEL 8+ and derivatives use dnf
+_ID_TO_PM: Dict[str, PackageManager] = {
+    **dict.fromkeys(("debian", "ubuntu", "linuxmint", "pop", "elementary", "zorin"), PackageManager.APT),
+    **dict.fromkeys(("fedora", "rhel", "centos", "rocky", "alma"), PackageManager.DNF),
+    "arch": PackageManager.PACMAN,
+    "alpine": PackageManager.APK,
+    **dict.fromkeys(("opensuse", "opensuse-leap", "opensuse-tumbleweed", "sles"), PackageManager.ZYPPER),
+}
+
+# Package manager by ID_LIKE entry, in priority order
+_LIKE_TO_PM: Dict[str, PackageManager] = {
+    "debian": PackageManager.APT,
+    "fedora": PackageManager.DNF,
+    "rhel": PackageManager.DNF,
+    "arch": PackageManager.PACMAN,
+    "suse": PackageManager.ZYPPER,
+}
+
+# Package manager binaries probed in PATH when os-release doesn't say;
+# each value is also the command name
+_PROBE_ORDER = (
+    PackageManager.APT,
+    PackageManager.DNF,
+    PackageManager.YUM,
+    PackageManager.PACMAN,
+    PackageManager.APK,
+    PackageManager.ZYPPER,
+)
+
+_INSTALL_CMDS: Dict[PackageManager, Tuple[str, ...]] = {
+    PackageManager.APT: ("apt", "install", "-y"),
+    PackageManager.DNF: ("dnf", "install", "-y"),
+    PackageManager.YUM: ("yum", "install", "-y"),
+    PackageManager.PACMAN: ("pacman", "-S", "--noconfirm"),
+    PackageManager.APK: ("apk", "add"),
+    PackageManager.ZYPPER: ("zypper", "install", "-y"),
+}
+
+_UPDATE_CMDS: Dict[PackageManager, Tuple[str, ...]] = {
+    PackageManager.APT: ("apt", "update"),
+    PackageManager.DNF: ("dnf", "check-update"),
+    PackageManager.YUM: ("yum", "check-update"),
+    PackageManager.PACMAN: ("pacman", "-Sy"),
+    PackageManager.APK: ("apk", "update"),
+    PackageManager.ZYPPER: ("zypper", "refresh"),
+}
+
+_UNKNOWN_CMD = ("echo", "Unknown package manager")
+
+
+@dataclass(frozen=True)
 class DistroInfo:
-    """Linux distribution information."""
+    """Linux distribution information.
+
+    Shared by every detect_distro() caller, so it is immutable.
+    """
+    # Declared by hand; dataclass(slots=True) needs Python 3.10
+    __slots__ = ("id", "name", "version", "id_like", "package_manager")
+
     id: str
     name: str
     version: str
-    id_like: List[str]
+    id_like: Tuple[str, ...]
     package_manager: PackageManager
 
     @property
     def is_debian_based(self) -> bool:
-        return self.id in ("debian", "ubuntu") or "debian" in self.id_like
+        return self.id in _DEBIAN_IDS or "debian" in self.id_like
 
     @property
     def is_rhel_based(self) -> bool:
-        return self.id in ("rhel", "centos", "fedora", "rocky", "alma") or any(
-            x in self.id_like for x in ("rhel", "fedora", "centos")
-        )
+        return self.id in _RHEL_IDS or not _RHEL_LIKE.isdisjoint(self.id_like)
 
     @property
     def is_arch_based(self) -> bool:
@@ -47,34 +107,53 @@ class DistroInfo:
 
     @property
     def is_suse_based(self) -> bool:
-        return self.id in ("opensuse", "sles") or "suse" in self.id_like
+        return self.id in _SUSE_IDS or "suse" in self.id_like
+
 
+@lru_cache(maxsize=1)
+def get_os_release() -> Dict[str, str]:
+    """Parse /etc/os-release into a dictionary.
 
+    Uses platform.freedesktop_os_release() on Python 3.10+, which handles
+    shell quoting and the /usr/lib/os-release fallback.
+
+    Returns:
+        Mapping of field name to unquoted value; empty if the file is missing
+    """
+    if hasattr(platform, "freedesktop_os_release"):
+        try:
+            return platform.freedesktop_os_release()
+        except OSError:
+            return {}
+
+    fields: Dict[str, str] = {}
+    try:
+        with open("/etc/os-release") as f:
+            for line in f:
+                key, sep, value = line.strip().partition("=")
+                if sep and not key.startswith("#"):
+                    fields[key] = value.strip("\"'")
+    except OSError:
+        pass
+    return fields
+
+
+@lru_cache(maxsize=1)
 def detect_distro() -> DistroInfo:
     """Detect the current Linux distribution.
 
+    The result is cached for the process; distro identity can't change
+    mid-session.
+
     Returns:
         DistroInfo object with distribution details
     """
-    os_release = Path("/etc/os-release")
+    os_release = get_os_release()
 
-    distro_id = "unknown"
-    distro_name = "Unknown"
-    distro_version = ""
-    id_like: List[str] = []
-
-    if os_release.exists():
-        with open(os_release) as f:
-            for line in f:
-                line = line.strip()
-                if line.startswith("ID="):
-                    distro_id = line.split("=", 1)[1].strip('"').lower()
-                elif line.startswith("NAME="):
-                    distro_name = line.split("=", 1)[1].strip('"')
-                elif line.startswith("VERSION_ID="):
-                    distro_version = line.split("=", 1)[1].strip('"')
-                elif line.startswith("ID_LIKE="):
-                    id_like = line.split("=", 1)[1].strip('"').lower().split()
+    distro_id = os_release.get("ID", "unknown").lower()
+    distro_name = os_release.get("NAME", "Unknown")
+    distro_version = os_release.get("VERSION_ID", "")
+    id_like = tuple(os_release.get("ID_LIKE", "").lower().split())
 
     # Determine package manager
     package_manager = _detect_package_manager(distro_id, id_like)
@@ -88,56 +167,32 @@ def detect_distro() -> DistroInfo:
     )
 
 
-def _detect_package_manager(distro_id: str, id_like: List[str]) -> PackageManager:
+def _detect_package_manager(distro_id: str, id_like: Tuple[str, ...]) -> PackageManager:
     """Detect the package manager for the given distribution.
 
     Args:
         distro_id: Distribution ID
-        id_like: List of similar distribution IDs
+        id_like: Similar distribution IDs
 
     Returns:
         PackageManager enum value
     """
     # Check by distro ID first
-    if distro_id in ("debian", "ubuntu", "linuxmint", "pop", "elementary", "zorin"):
-        return PackageManager.APT
-    elif distro_id in ("fedora",):
-        return PackageManager.DNF
-    elif distro_id in ("rhel", "centos", "rocky", "alma"):
-        # RHEL 8+ and derivatives use dnf
-        return PackageManager.DNF
-    elif distro_id == "arch":
-        return PackageManager.PACMAN
-    elif distro_id == "alpine":
-        return PackageManager.APK
-    elif distro_id in ("opensuse", "opensuse-leap", "opensuse-tumbleweed", "sles"):
-        return PackageManager.ZYPPER
+    manager = _ID_TO_PM.get(distro_id)
+    if manager is not None:
+        return manager
 
     # Check by id_like
-    if "debian" in id_like:
-        return PackageManager.APT
-    elif "fedora" in id_like or "rhel" in id_like:
-        return PackageManager.DNF
-    elif "arch" in id_like:
-        return PackageManager.PACMAN
-    elif "suse" in id_like:
-        return PackageManager.ZYPPER
+    for like, manager in _LIKE_TO_PM.items():
+        if like in id_like:
+            return manager
 
     # Check if commands exist
     from .command import check_command_exists
 
-    if check_command_exists("apt"):
-        return PackageManager.APT
-    elif check_command_exists("dnf"):
-        return PackageManager.DNF
-    elif check_command_exists("yum"):
-        return PackageManager.YUM
-    elif check_command_exists("pacman"):
-        return PackageManager.PACMAN
-    elif check_command_exists("apk"):
-        return PackageManager.APK
-    elif check_command_exists("zypper"):
-        return PackageManager.ZYPPER
+    for manager in _PROBE_ORDER:
+        if check_command_exists(manager.value):
+            return manager
 
     return PackageManager.UNKNOWN
 
@@ -164,17 +219,7 @@ def get_install_command(packages: List[str], package_manager: Optional[PackageMa
     if package_manager is None:
         package_manager = get_package_manager()
 
-    commands = {
-        PackageManager.APT: ["apt", "install", "-y"],
-        PackageManager.DNF: ["dnf", "install", "-y"],
-        PackageManager.YUM: ["yum", "install", "-y"],
-        PackageManager.PACMAN: ["pacman", "-S", "--noconfirm"],
-        PackageManager.APK: ["apk", "add"],
-        PackageManager.ZYPPER: ["zypper", "install", "-y"],
-    }
-
-    base_cmd = commands.get(package_manager, ["echo", "Unknown package manager"])
-    return base_cmd + packages
+    return [*_INSTALL_CMDS.get(package_manager, _UNKNOWN_CMD), *packages]
 
 
 def get_update_command(package_manager: Optional[PackageManager] = None) -> List[str]:
@@ -189,13 +234,4 @@ def get_update_command(package_manager: Optional[PackageManager] = None) -> List
     if package_manager is None:
         package_manager = get_package_manager()
 
-    commands = {
-        PackageManager.APT: ["apt", "update"],
-        PackageManager.DNF: ["dnf", "check-update"],
-        PackageManager.YUM: ["yum", "check-update"],
-        PackageManager.PACMAN: ["pacman", "-Sy"],
-        PackageManager.APK: ["apk", "update"],
-        PackageManager.ZYPPER: ["zypper", "refresh"],
-    }
-
-    return commands.get(package_manager, ["echo", "Unknown package manager"])
+    return list(_UPDATE_CMDS.get(package_manager, _UNKNOWN_CMD))
@@ -0,0 +1,202 @@
+"""HTTP download utilities with per-host connection reuse."""
+
+import gzip
+import http.client
+import shutil
+import socket
+import threading
+from typing import BinaryIO, Dict, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+# Persistent connections keyed by (scheme, host) so repeated fetches
+# skip the TCP + TLS handshake
+_connections: Dict[tuple, http.client.HTTPConnection] = {}
+# Background connects started by prewarm(), joined before first use
+_warming: Dict[tuple, threading.Thread] = {}
+
+_REDIRECT_CODES = (301, 302, 303, 307, 308)
+_MAX_REDIRECTS = 5
+
+
+def _get_connection(scheme: str, host: str, timeout: int) -> http.client.HTTPConnection:
+    """Get a cached connection for a host, creating it if needed.
+
+    Args:
+        scheme: URL scheme (http or https)
+        host: Host with optional port
+        timeout: Socket timeout in seconds
+
+    Returns:
+        HTTP(S) connection object
+    """
+    key = (scheme, host)
+    warming = _warming.pop(key, None)
+    if warming is not None:
+        warming.join()
+
+    conn = _connections.get(key)
+    if conn is None:
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(host, timeout=timeout)
+        else:
+            conn = http.client.HTTPConnection(host, timeout=timeout)
+        _connections[key] = conn
+    return conn
+
+
+def prewarm(url: str, timeout: int = 15):
+    """Resolve and connect to a URL's host in the background.
+
+    Meant to be called before slow user prompts so DNS, TCP and TLS
+    setup overlap with typing. Failures are ignored; the real request
+    simply reconnects.
+
+    Args:
+        url: URL whose host will be requested later
+        timeout: Socket timeout in seconds
+    """
+    parts = urlsplit(url)
+    key = (parts.scheme, parts.netloc)
+    if key in _connections or key in _warming:
+        return
+
+    conn = _get_connection(parts.scheme, parts.netloc, timeout)
+
+    def _connect():
+        try:
+            conn.connect()
+        except OSError:
+            conn.close()
+
+    thread = threading.Thread(target=_connect, daemon=True)
+    _warming[key] = thread
+    thread.start()
+
+
+def open_url(url: str, retries: int = 3, timeout: int = 15) -> Optional[BinaryIO]:
+    """Open a URL for streaming, following redirects and decoding gzip.
+
+    The returned stream must be read to the end (or closed) before the
+    next request to the same host, so the connection can be reused.
+
+    Args:
+        url: URL to fetch
+        retries: Attempts per request on connection errors
+        timeout: Socket timeout in seconds
+
+    Returns:
+        Readable binary stream of the response body, or None on failure
+    """
+    for _ in range(_MAX_REDIRECTS + 1):
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path += f"?{parts.query}"
+
+        response = None
+        for _ in range(retries):
+            conn = _get_connection(parts.scheme, parts.netloc, timeout)
+            try:
+                conn.request("GET", path, headers={"Accept-Encoding": "gzip"})
+                response = conn.getresponse()
+                break
+            except (OSError, http.client.HTTPException):
+                # Drop the broken socket; the next request reconnects
+                conn.close()
+
+        if response is None:
+            return None
+
+        if response.status in _REDIRECT_CODES and response.getheader("Location"):
+            response.read()
+            url = urljoin(url, response.getheader("Location"))
+            continue
+
+        if response.status != 200:
+            response.read()
+            return None
+
+        if response.getheader("Content-Encoding") == "gzip":
+            return gzip.GzipFile(fileobj=response)
+        return response
+
+    return None
+
+
+def download(url: str, dest: BinaryIO, chunk_size: int = 64 * 1024) -> bool:
+    """Stream a URL's body into a writable binary file object.
+
+    Args:
+        url: URL to fetch
+        dest: Destination file object opened in binary mode
+        chunk_size: Bytes copied per read
+
+    Returns:
+        True on success, False on failure
+    """
+    response = open_url(url)
+    if response is None:
+        return False
+
+    try:
+        shutil.copyfileobj(response, dest, chunk_size)
+        return True
+    except (OSError, EOFError, http.client.HTTPException):
+        return False
+    finally:
+        response.close()
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a Unix domain socket."""
+
+    def __init__(self, socket_path: str, timeout: int):
+        super().__init__("localhost", timeout=timeout)
+        self._socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._socket_path)
+
+
+def unix_fetch(
+    socket_path: str, method: str, path: str, timeout: int = 30
+) -> Optional[Tuple[int, bytes]]:
+    """Send a body-less HTTP request to a Unix socket API and read the reply.
+
+    Args:
+        socket_path: Path to the Unix socket
+        method: HTTP method
+        path: Request path
+        timeout: Socket timeout in seconds
+
+    Returns:
+        Tuple of (status code, response body), or None if the socket is
+        missing or not accessible
+    """
+    conn = _UnixHTTPConnection(socket_path, timeout)
+    try:
+        conn.request(method, path)
+        response = conn.getresponse()
+        return response.status, response.read()
+    except (OSError, http.client.HTTPException):
+        return None
+    finally:
+        conn.close()
+
+
+def unix_request(socket_path: str, method: str, path: str, timeout: int = 30) -> Optional[int]:
+    """Send a body-less HTTP request to a Unix socket API (e.g. Docker).
+
+    Args:
+        socket_path: Path to the Unix socket
+        method: HTTP method
+        path: Request path
+        timeout: Socket timeout in seconds
+
+    Returns:
+        HTTP status code, or None if the socket is missing or not accessible
+    """
+    result = unix_fetch(socket_path, method, path, timeout)
+    return result[0] if result is not None else None
@@ -2,21 +2,69 @@
 
 import os
 import sys
-from typing import List, Optional, Callable, Any, Dict, Set, Tuple
-from rich.console import Console
-from rich.panel import Panel
-from rich.table import Table
-from rich.prompt import Prompt, Confirm
-from rich.text import Text
-from rich import box
+from typing import TYPE_CHECKING, List, NamedTuple, Optional, Callable, Any, Dict, Set, Tuple
 
-# Global console instance
-console = Console()
+if TYPE_CHECKING:
+    from rich.console import Console
+
+# Shared console, created on first use; rich is imported lazily so modules
+# that only need validators or distro helpers don't pay for it
+_console: Optional["Console"] = None
+
+# Home, clear screen and clear scrollback: what clear(1) emits, without
+# forking a shell for every menu redraw
+_CLEAR_SEQ = "\x1b[H\x1b[2J\x1b[3J"
+
+
+class StatusRow(NamedTuple):
+    """One line of display_status() output."""
+    label: str
+    status: str
+    is_ok: bool
+
+
+# Rendered print_header() output keyed by (title, subtitle, width)
+_header_cache: Dict[Tuple[str, str, int], str] = {}
+
+
+def _get_console() -> "Console":
+    """Get the shared rich console, creating it on first use.
+
+    Returns:
+        Console instance
+    """
+    global _console
+    if _console is None:
+        from rich.console import Console
+
+        _console = Console()
+    return _console
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve ``console`` lazily for ``from .ui import console``.
+
+    Args:
+        name: Attribute being looked up
+
+    Returns:
+        The shared console
+
+    Raises:
+        AttributeError: For any other name
+    """
+    if name == "console":
+        return _get_console()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def clear_screen():
     """Clear the terminal screen."""
-    os.system("cls" if os.name == "nt" else "clear")
+    if os.name == "nt":
+        os.system("cls")
+        return
+    sys.stdout.write(_CLEAR_SEQ)
+    sys.stdout.flush()
 
 
 def print_header(title: str, subtitle: str = ""):
@@ -26,12 +74,26 @@ def print_header(title: str, subtitle: str = ""):
         title: Main title text
         subtitle: Optional subtitle
     """
-    text = Text()
-    text.append(title, style="bold cyan")
-    if subtitle:
-        text.append(f"\n{subtitle}", style="dim")
+    # Menus redraw the same headers constantly; render each one once per
+    # terminal width and replay the bytes afterwards
+    console = _get_console()
+    key = (title, subtitle, console.width)
+    rendered = _header_cache.get(key)
+    if rendered is None:
+        from rich import box
+        from rich.panel import Panel
+        from rich.text import Text
+
+        text = Text()
+        text.append(title, style="bold cyan")
+        if subtitle:
+            text.append(f"\n{subtitle}", style="dim")
 
-    console.print(Panel(text, box=box.ROUNDED, border_style="cyan"))
+        with console.capture() as capture:
+            console.print(Panel(text, box=box.ROUNDED, border_style="cyan"))
+        rendered = _header_cache[key] = capture.get()
+
+    console.file.write(rendered)
 
 
 def print_success(message: str):
@@ -40,7 +102,7 @@ def print_success(message: str):
     Args:
         message: Message to display
     """
-    console.print(f"[green]✓[/green] {message}")
+    _get_console().print(f"[green]✓[/green] {message}")
 
 
 def print_error(message: str):
@@ -49,7 +111,7 @@ def print_error(message: str):
     Args:
         message: Message to display
     """
-    console.print(f"[red]✗[/red] {message}")
+    _get_console().print(f"[red]✗[/red] {message}")
 
 
 def print_warning(message: str):
@@ -58,7 +120,7 @@ def print_warning(message: str):
     Args:
         message: Message to display
     """
-    console.print(f"[yellow]![/yellow] {message}")
+    _get_console().print(f"[yellow]![/yellow] {message}")
 
 
 def print_info(message: str):
@@ -67,7 +129,7 @@ def print_info(message: str):
     Args:
         message: Message to display
     """
-    console.print(f"[blue]ℹ[/blue] {message}")
+    _get_console().print(f"[blue]ℹ[/blue] {message}")
 
 
 def confirm(message: str, default: bool = False) -> bool:
@@ -80,7 +142,9 @@ def confirm(message: str, default: bool = False) -> bool:
     Returns:
         True if confirmed, False otherwise
     """
-    return Confirm.ask(message, default=default)
+    from rich.prompt import Confirm
+
+    return Confirm.ask(message, default=default, console=_get_console())
 
 
 def prompt(message: str, default: str = "", password: bool = False) -> str:
@@ -94,7 +158,24 @@ def prompt(message: str, default: str = "", password: bool = False) -> str:
     Returns:
         User input string
     """
-    return Prompt.ask(message, default=default, password=password)
+    from rich.prompt import Prompt
+
+    return Prompt.ask(message, default=default, password=password, console=_get_console())
+
+
+def _menu_lines(items: List[str], show_numbers: bool) -> List[str]:
+    """Format menu entries for select_from_list / multi_select_from_list.
+
+    Args:
+        items: Entries to list
+        show_numbers: Whether to number entries (bullets otherwise)
+
+    Returns:
+        One markup line per entry
+    """
+    if show_numbers:
+        return [f"  [cyan]{i}.[/cyan] {item}" for i, item in enumerate(items, 1)]
+    return [f"  • {item}" for item in items]
 
 
 def select_from_list(
@@ -114,16 +195,12 @@ def select_from_list(
     Returns:
         Selected index (0-based) or None if back/cancelled
     """
-    console.print(f"\n[bold]{title}[/bold]")
-
-    for i, item in enumerate(items, 1):
-        if show_numbers:
-            console.print(f"  [cyan]{i}.[/cyan] {item}")
-        else:
-            console.print(f"  • {item}")
-
+    # One print for the whole menu; each console.print() call re-runs
+    # rich's markup parsing and render pipeline
+    lines = [f"\n[bold]{title}[/bold]", *_menu_lines(items, show_numbers)]
     if allow_back:
-        console.print(f"  [dim]b. Back[/dim]")
+        lines.append("  [dim]b. Back[/dim]")
+    _get_console().print("\n".join(lines))
 
     while True:
         choice = prompt("\nEnter choice").strip().lower()
@@ -140,6 +217,22 @@ def select_from_list(
             print_error("Please enter a number.")
 
 
+def _fold_keywords(keywords: Optional[Dict[str, List[int]]]) -> Dict[str, List[int]]:
+    """Lowercase keyword names, reusing the mapping if they already are.
+
+    Args:
+        keywords: Keyword map to indices, or None
+
+    Returns:
+        Mapping with lowercase keys
+    """
+    if not keywords:
+        return {}
+    if all(key == key.lower() for key in keywords):
+        return keywords
+    return {key.lower(): value for key, value in keywords.items()}
+
+
 def parse_multi_select_indices(
     raw_input: str,
     item_count: int,
@@ -151,7 +244,7 @@ def parse_multi_select_indices(
     plus optional caller-provided keywords such as ``all/*`` or ``missing/m``.
 
     Args:
-        raw_input: Raw user input string
+        raw_input: Raw user input string; keywords match case-insensitively
         item_count: Number of selectable items
         special_keywords: Optional keyword map to indices (0-based)
 
@@ -160,37 +253,50 @@ def parse_multi_select_indices(
         - ``indices`` is a list of deduplicated indices in menu order when valid
         - ``error_message`` is set when parsing fails
     """
-    value = (raw_input or "").strip().lower()
+    value = (raw_input or "").strip()
     if not value:
         return None, "Input is empty. Enter numbers, ranges, or a supported keyword."
 
-    keyword_map = {k.lower(): v for k, v in (special_keywords or {}).items()}
-    if value in keyword_map:
+    keyword_map = _fold_keywords(special_keywords)
+    # Numbers, commas and dashes are case-invariant; only keyword matching
+    # needs the input folded
+    keyword = value.lower() if keyword_map else value
+    if keyword in keyword_map:
         selected: Set[int] = set()
-        for idx in keyword_map[value]:
+        for idx in keyword_map[keyword]:
             if not 0 <= idx < item_count:
                 return None, (
-                    f"Keyword '{value}' contains out-of-range value: {idx + 1}. "
+                    f"Keyword '{keyword}' contains out-of-range value: {idx + 1}. "
                     f"Valid range is 1-{item_count}."
                 )
             selected.add(idx)
-        return [i for i in range(item_count) if i in selected], None
+        return sorted(selected), None
 
     selected: Set[int] = set()
-    tokens = [token.strip() for token in value.split(",")]
+    # Walk comma-delimited tokens in place rather than materialising
+    # split() lists per token
+    pos = 0
+    length = len(value)
+    while pos <= length:
+        comma = value.find(",", pos)
+        if comma == -1:
+            comma = length
+        token = value[pos:comma].strip()
+        pos = comma + 1
 
-    for token in tokens:
         if not token:
             return None, "Malformed token: empty value between commas."
 
-        if "-" in token:
-            parts = [part.strip() for part in token.split("-")]
-            if len(parts) != 2 or not parts[0] or not parts[1]:
+        start_text, dash, end_text = token.partition("-")
+        if dash:
+            start_text = start_text.strip()
+            end_text = end_text.strip()
+            if not start_text or not end_text or "-" in end_text:
                 return None, f"Malformed token '{token}'. Expected range like '4-7'."
 
             try:
-                start = int(parts[0])
-                end = int(parts[1])
+                start = int(start_text)
+                end = int(end_text)
             except ValueError:
                 return None, f"Malformed token '{token}'. Range values must be numbers."
 
@@ -205,8 +311,7 @@ def parse_multi_select_indices(
                     f"Out-of-range value in '{token}'. Valid range is 1-{item_count}."
                 )
 
-            for val in range(start, end + 1):
-                selected.add(val - 1)
+            selected.update(range(start - 1, end))
             continue
 
         try:
@@ -221,7 +326,7 @@ def parse_multi_select_indices(
 
         selected.add(num - 1)
 
-    return [i for i in range(item_count) if i in selected], None
+    return sorted(selected), None
 
 
 def multi_select_from_list(
@@ -249,22 +354,19 @@ def multi_select_from_list(
         List of selected indices (0-based) in deterministic menu order,
         or ``None`` when back/cancel is selected.
     """
-    console.print(f"\n[bold]{title}[/bold]")
-
-    for i, item in enumerate(items, 1):
-        if show_numbers:
-            console.print(f"  [cyan]{i}.[/cyan] {item}")
-        else:
-            console.print(f"  • {item}")
+    lines = [f"\n[bold]{title}[/bold]", *_menu_lines(items, show_numbers)]
 
     hints: List[str] = ["comma-separated numbers (e.g. 1,3,5)", "ranges (e.g. 4-7)"]
     if special_keywords:
         hints.append("keywords: " + ", ".join(sorted(special_keywords.keys())))
-    console.print(f"  [dim]Hint: {'; '.join(hints)}[/dim]")
+    lines.append(f"  [dim]Hint: {'; '.join(hints)}[/dim]")
 
+    # Fold once here instead of on every retry below
+    special_keywords = _fold_keywords(special_keywords)
     normalized_back = (back_value or "b").strip().lower()
     if allow_back:
-        console.print(f"  [dim]{normalized_back}. Back/Cancel[/dim]")
+        lines.append(f"  [dim]{normalized_back}. Back/Cancel[/dim]")
+    _get_console().print("\n".join(lines))
 
     while True:
         choice = prompt("\nEnter choices").strip().lower()
@@ -331,6 +433,9 @@ def display_table(
         rows: List of row data
         show_header: Whether to show column headers
     """
+    from rich import box
+    from rich.table import Table
+
     table = Table(title=title, box=box.ROUNDED, show_header=show_header)
 
     for col in columns:
@@ -339,7 +444,7 @@ def display_table(
     for row in rows:
         table.add_row(*row)
 
-    console.print(table)
+    _get_console().print(table)
 
 
 def pause(message: str = "Press Enter to continue..."):
@@ -348,16 +453,21 @@ def pause(message: str = "Press Enter to continue..."):
     Args:
         message: Message to display
     """
-    console.input(f"\n[dim]{message}[/dim]")
+    _get_console().input(f"\n[dim]{message}[/dim]")
 
 
-def display_status(items: List[tuple]):
+def display_status(items: List[StatusRow]):
     """Display a status list with colored indicators.
 
     Args:
-        items: List of (label, status, is_ok) tuples
+        items: Status rows to show
     """
-    for label, status, is_ok in items:
-        color = "green" if is_ok else "red"
-        indicator = "●" if is_ok else "○"
-        console.print(f"  [{color}]{indicator}[/{color}] {label}: {status}")
+    if not items:
+        return
+
+    lines = []
+    for row in items:
+        color = "green" if row.is_ok else "red"
+        indicator = "●" if row.is_ok else "○"
+        lines.append(f"  [{color}]{indicator}[/{color}] {row.label}: {row.status}")
+    _get_console().print("\n".join(lines))
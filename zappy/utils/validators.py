@@ -1,8 +1,14 @@
 """Input validation utilities."""
 
+import ipaddress
 import re
 from typing import Optional
 
+_DOMAIN_RE = re.compile(r"^(?:[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,}$")
+_EMAIL_RE = re.compile(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$")
+_URL_RE = re.compile(r"^https?://[^\s/$.?#].[^\s]*$", re.IGNORECASE)
+_HAS_PROTO_RE = re.compile(r"^https?://", re.IGNORECASE)
+
 
 def validate_domain(domain: str) -> tuple[bool, Optional[str]]:
     """Validate a domain name.
@@ -16,15 +22,13 @@ def validate_domain(domain: str) -> tuple[bool, Optional[str]]:
     if not domain:
         return False, "Domain cannot be empty"
 
-    # Basic domain pattern
-    pattern = r"^(?:[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,}$"
-
-    if not re.match(pattern, domain):
-        return False, "Invalid domain format"
-
+    # Cheap length check first; no point running the regex on a long string
     if len(domain) > 253:
         return False, "Domain name too long"
 
+    if not _DOMAIN_RE.match(domain):
+        return False, "Invalid domain format"
+
     return True, None
 
 
@@ -55,23 +59,18 @@ def validate_ip(ip: str) -> tuple[bool, Optional[str]]:
     Returns:
         Tuple of (is_valid, error_message)
     """
-    # IPv4 pattern
-    ipv4_pattern = r"^(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)$"
+    if not ip:
+        return False, "IP address cannot be empty"
 
-    # Simplified IPv6 pattern (covers most common cases)
-    ipv6_pattern = r"^(?:[0-9a-fA-F]{1,4}:){7}[0-9a-fA-F]{1,4}$|^::1$|^::$"
-
-    if re.match(ipv4_pattern, ip):
+    if ip == "localhost":
         return True, None
 
-    if re.match(ipv6_pattern, ip):
-        return True, None
-
-    # Try localhost
-    if ip in ("localhost", "127.0.0.1", "::1"):
-        return True, None
+    try:
+        ipaddress.ip_address(ip)
+    except ValueError:
+        return False, "Invalid IP address format"
 
-    return False, "Invalid IP address format"
+    return True, None
 
 
 def validate_url(url: str) -> tuple[bool, Optional[str]]:
@@ -86,10 +85,7 @@ def validate_url(url: str) -> tuple[bool, Optional[str]]:
     if not url:
         return False, "URL cannot be empty"
 
-    # Basic URL pattern
-    pattern = r"^https?://[^\s/$.?#].[^\s]*$"
-
-    if re.match(pattern, url, re.IGNORECASE):
+    if _URL_RE.match(url):
         return True, None
 
     return False, "Invalid URL format"
@@ -107,9 +103,7 @@ def validate_email(email: str) -> tuple[bool, Optional[str]]:
     if not email:
         return False, "Email cannot be empty"
 
-    pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
-
-    if re.match(pattern, email):
+    if _EMAIL_RE.match(email):
         return True, None
 
     return False, "Invalid email format"
@@ -133,11 +127,11 @@ def normalize_proxy_url(url: str) -> str:
     url = url.strip()
 
     # If already has protocol, return as is
-    if re.match(r"^https?://", url, re.IGNORECASE):
+    if _HAS_PROTO_RE.match(url):
         return url
 
     # If it's just a port number, assume localhost
-    if re.match(r"^\d+$", url):
+    if url.isdigit():
         return f"http://127.0.0.1:{url}"
 
     # Otherwise add http://